@@ -0,0 +1,42 @@
+"""Throughput of the JSON serializers on nested payloads.
+
+Run with `poetry run python benchmarks/bench_json_serializers.py`.
+"""
+
+import time
+from decimal import Decimal
+
+from target_mssql.projector import json_dumps_orjson, json_dumps_stdlib, orjson
+
+VALUES = 200_000
+
+
+def nested_payload(seed):
+    return {
+        "id": seed,
+        "name": f"customer {seed}",
+        "balance": Decimal(seed) / 100,
+        "tags": ["a", "b", str(seed)],
+        "address": {"street": "Main st", "number": seed % 200, "geo": [59.9, 10.7]},
+        "orders": [{"id": seed * 10 + i, "total": i * 1.5} for i in range(3)],
+    }
+
+
+def main():
+    payloads = [nested_payload(seed) for seed in range(VALUES)]
+    serializers = [("json", json_dumps_stdlib)]
+    if orjson is not None:
+        serializers.append(("orjson", json_dumps_orjson))
+    else:
+        print("orjson is not installed, only benchmarking json")
+
+    for name, dumps in serializers:
+        start = time.perf_counter()
+        for payload in payloads:
+            dumps(payload)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>6}: {VALUES / elapsed:12,.0f} values/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Rows/sec of draining batches inline vs pipelined, on a 50-column schema.
+
+Statements sleep to stand in for the time SQL Server spends ingesting them;
+like pymssql's network I/O, sleeping releases the GIL. With `insert`, every
+small statement has to win the GIL back from the projecting thread, which
+caps the overlap; `bulk_copy` sends each batch in a few large calls.
+
+Run with `poetry run python benchmarks/bench_pipelined.py`.
+"""
+
+import time
+from types import SimpleNamespace
+
+from common import NullConnection, make_sink, wide_record, wide_schema
+
+BATCHES = 10
+BATCH_SIZE = 5_000
+COLUMNS = 50
+# Simulated server time per inserted row
+SECONDS_PER_ROW = 40e-6
+
+
+class SlowBulkCopyConnection:
+    """Discards bulk copies after waiting as long as a server would take."""
+
+    def bulk_copy(self, table_name, elements, column_ids=None, **kwargs):
+        time.sleep(SECONDS_PER_ROW * len(elements))
+
+    def commit(self):
+        pass
+
+
+class SlowConnection(NullConnection):
+    """Discards statements after waiting as long as a server would take."""
+
+    connection = SimpleNamespace(connection=SlowBulkCopyConnection())
+
+    def exec_driver_sql(self, statement, parameters=None):
+        time.sleep(SECONDS_PER_ROW * len(parameters) / COLUMNS)
+
+
+def main():
+    schema = wide_schema(COLUMNS)
+    batches = [
+        [wide_record(schema, seed) for seed in range(BATCH_SIZE)]
+        for _ in range(BATCHES)
+    ]
+    for load_method in ["insert", "bulk_copy"]:
+        for name, pipelined in [("inline", False), ("pipelined", True)]:
+            sink = make_sink(
+                schema, config={"load_method": load_method, "pipelined": pipelined}
+            )
+            sink.connector._connection = SlowConnection()
+            sink.connector.get_table_columns = lambda *args, **kwargs: dict.fromkeys(
+                schema["properties"]
+            )
+            start = time.perf_counter()
+            for records in batches:
+                sink.process_batch({"records": records})
+            sink._target.wait_for_drains()
+            elapsed = time.perf_counter() - start
+            rows_per_sec = BATCHES * BATCH_SIZE / elapsed
+            print(f"{load_method:>9} {name:>9}: {rows_per_sec:10,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Helpers shared by the benchmark scripts.
+
+The benchmarks run without a SQL Server: sinks are wired to a connection
+that accepts statements and discards them, so only client-side work is
+measured.
+"""
+
+from types import SimpleNamespace
+
+from target_mssql.sinks import mssqlSink
+from target_mssql.target import Targetmssql
+
+CONFIG = {
+    "username": "sa",
+    "password": "P@55w0rd",
+    "host": "localhost",
+    "port": "1433",
+    "database": "master",
+}
+
+
+class NullConnection:
+    """Accepts statements and discards them."""
+
+    dialect = SimpleNamespace(paramstyle="pyformat")
+    connection = SimpleNamespace(connection=None)
+
+    def execute(self, statement, *multiparams, **params):
+        pass
+
+    def exec_driver_sql(self, statement, parameters=None):
+        pass
+
+    def in_transaction(self):
+        return False
+
+
+def make_sink(schema, key_properties=None, config=None):
+    """Build an `mssqlSink` that sends everything to a `NullConnection`."""
+    target = Targetmssql(config={**CONFIG, **(config or {})})
+    sink = mssqlSink(
+        target=target,
+        stream_name="benchmark",
+        schema=schema,
+        key_properties=key_properties or [],
+    )
+    sink.connector._connection = NullConnection()
+    return sink
+
+
+def wide_schema(column_count):
+    """Return a schema of `column_count` columns cycling through common types."""
+    types = [
+        {"type": ["string", "null"]},
+        {"type": ["integer", "null"]},
+        {"type": ["number", "null"]},
+        {"type": ["boolean", "null"]},
+        {"type": ["object", "null"]},
+    ]
+    return {
+        "type": "object",
+        "properties": {
+            f"column{i}": types[i % len(types)] for i in range(column_count)
+        },
+    }
+
+
+def wide_record(schema, seed):
+    """Return a record with a value for every column in `schema`."""
+    record = {}
+    for i, (name, jsonschema) in enumerate(schema["properties"].items()):
+        json_type = jsonschema["type"][0]
+        if json_type == "string":
+            record[name] = f"value {seed} {i}"
+        elif json_type == "integer":
+            record[name] = seed * i
+        elif json_type == "number":
+            record[name] = seed / (i + 1)
+        elif json_type == "boolean":
+            record[name] = bool((seed + i) % 2)
+        else:
+            record[name] = {"id": seed, "tags": [i, i + 1]}
+    return record
@@ -0,0 +1,77 @@
+"""Asyncio execution backend for batch loads."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class AsyncWriter:
+    """Runs batch loads as tasks of an asyncio event loop.
+
+    The loop runs in a background thread, so sinks keep their synchronous
+    API and only hand loads over. pymssql has no async interface, so each
+    load is offloaded to a small thread pool. Many streams therefore share
+    `max_concurrency` worker threads instead of holding one thread each.
+    Loads of one stream are chained with `after`, so they keep their order
+    without blocking the thread that submits them.
+    """
+
+    def __init__(self, max_concurrency: int) -> None:
+        """Start the event loop.
+
+        Args:
+            max_concurrency: The number of loads that may run at the same time.
+        """
+        self.max_concurrency = max_concurrency
+        self._loop = asyncio.new_event_loop()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="target-mssql-async-io"
+        )
+        # Created on the loop, as asyncio primitives bind to a loop on Python < 3.10
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._thread = threading.Thread(
+            target=self._loop.run_forever,
+            name="target-mssql-async-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def submit(
+        self, fn: Callable[..., Any], *args: Any, after: Optional[Future] = None
+    ) -> Future:
+        """Schedule a load on the event loop.
+
+        Args:
+            fn: The blocking function loading a batch.
+            args: Arguments for `fn`.
+            after: A load that must finish first. If it fails, this load fails
+                with the same error instead of running.
+
+        Returns:
+            A future of the load, usable from any thread.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self._run(functools.partial(fn, *args), after), self._loop
+        )
+
+    async def _run(self, load: Callable[[], Any], after: Optional[Future]) -> Any:
+        if after is not None:
+            await asyncio.wrap_future(after)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await self._loop.run_in_executor(self._executor, load)
+
+    def close(self) -> None:
+        """Stop the event loop and release its threads.
+
+        Loads still pending are abandoned, so wait for their futures first.
+        """
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+        self._loop.close()
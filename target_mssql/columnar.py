@@ -0,0 +1,91 @@
+"""Column-at-a-time projection of record batches to positional rows."""
+
+from __future__ import annotations
+
+from itertools import repeat
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+from target_mssql.projector import JsonSerializer
+
+ColumnConverter = Callable[[List[Any]], List[Any]]
+
+
+def coerce_boolean_column(values: List[Any]) -> List[Any]:
+    """Convert the booleans of a column to the '1'/'0' of VARCHAR(1) columns."""
+    return [
+        "1" if value is True else "0" if value is False else value for value in values
+    ]
+
+
+def json_column_converter(serializer: JsonSerializer) -> ColumnConverter:
+    """Return a column converter serializing nested values, passing scalars."""
+
+    def serialize(values: List[Any]) -> List[Any]:
+        return [
+            serializer(value) if isinstance(value, (dict, list)) else value
+            for value in values
+        ]
+
+    return serialize
+
+
+class ColumnarProjector:
+    """Projects a batch of raw records onto rows, one column at a time.
+
+    Each column is gathered from the records and converted in a single pass,
+    so conversions run once per column instead of once per value and the
+    records are read by their original property names, without building a
+    conformed copy of each. The columns are then zipped into row tuples,
+    which is what the bulk copy and INSERT writers consume.
+    """
+
+    def __init__(
+        self,
+        column_names: Sequence[str],
+        property_names: Sequence[str],
+        converters: Dict[str, ColumnConverter] | None = None,
+    ) -> None:
+        """Compile a projector.
+
+        Args:
+            column_names: The columns, in the order rows are emitted.
+            property_names: The record property of each column.
+            converters: Column conversion functions for the columns that
+                need them.
+        """
+        self.column_names: Tuple[str, ...] = tuple(column_names)
+        converters = converters or {}
+        self._columns: List[Tuple[str, ColumnConverter | None]] = [
+            (property_name, converters.get(column_name))
+            for column_name, property_name in zip(self.column_names, property_names)
+        ]
+
+    def columns(self, records: Sequence[dict]) -> List[List[Any]]:
+        """Gather and convert the columns of a batch.
+
+        Args:
+            records: Raw records. Missing properties become None.
+
+        Returns:
+            One list of values per column, in `column_names` order.
+        """
+        columns = []
+        for property_name, convert in self._columns:
+            values = list(map(dict.get, records, repeat(property_name)))
+            if convert is not None:
+                values = convert(values)
+            columns.append(values)
+        return columns
+
+    def __call__(self, records: Sequence[dict]) -> Iterator[Tuple[Any, ...]]:
+        """Project a batch of records.
+
+        Args:
+            records: Raw records. Missing properties become None.
+
+        Returns:
+            Tuples of values in `column_names` order, one per record.
+        """
+        if not self._columns:
+            return iter([()] * len(records))
+        return zip(*self.columns(records))
@@ -1,12 +1,33 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, List, Optional, cast
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, cast
 
 import sqlalchemy
 from singer_sdk.connectors.sql import SQLConnector
 from singer_sdk.helpers._typing import get_datelike_property_type
 from sqlalchemy.dialects import mssql
 
+from target_mssql.type_inference import ColumnProfile
+from target_mssql.type_lattice import join_keys, type_key, type_of_key
+
+# Integer types by name
+INTEGER_TYPES = {
+    "SMALLINT": sqlalchemy.types.SMALLINT,
+    "INT": sqlalchemy.types.INTEGER,
+    "BIGINT": sqlalchemy.types.BIGINT,
+}
+# Column types of date-time properties, by the `datetime_type` setting
+DATETIME_TYPES = {
+    "datetime": sqlalchemy.types.DATETIME,
+    "datetime2": mssql.DATETIME2,
+    "datetimeoffset": mssql.DATETIMEOFFSET,
+}
+
+# Used to render column types in hand-written DDL, so that lengths such as
+# VARCHAR(max) survive instead of the bare type name.
+DDL_DIALECT = mssql.dialect()
+
 
 class mssqlConnector(SQLConnector):
     """The connector for mssql.
@@ -20,6 +41,83 @@ class mssqlConnector(SQLConnector):
     allow_merge_upsert: bool = True  # Whether MERGE UPSERT is supported.
     allow_temp_tables: bool = True  # Whether temp tables are supported.
 
+    def __init__(
+        self, config: dict | None = None, sqlalchemy_url: str | None = None
+    ) -> None:
+        """Initialize the connector and its table metadata cache.
+        Args:
+            config: The parent tap or target object's config.
+            sqlalchemy_url: Optional URL for the connection.
+        """
+        super().__init__(config, sqlalchemy_url)
+        # Reflected columns per full table name. Only this connector's own DDL
+        # changes the tables it loads, so entries are dropped by that DDL alone.
+        self._table_columns_cache: Dict[str, Dict[str, sqlalchemy.Column]] = {}
+        # Bumped by every DDL statement this connector runs against a table
+        self._table_generations: Dict[str, int] = {}
+        self.table_cache_hits = 0
+        self.table_cache_misses = 0
+
+    def invalidate_table_cache(self, full_table_name: str) -> None:
+        """Forget the cached metadata of a table.
+        Args:
+            full_table_name: the table name.
+        """
+        self._table_columns_cache.pop(full_table_name, None)
+        self._table_generations[full_table_name] = (
+            self._table_generations.get(full_table_name, 0) + 1
+        )
+
+    def table_generation(self, full_table_name: str) -> int:
+        """Return how often this connector has changed a table.
+        Args:
+            full_table_name: the table name.
+        Returns:
+            A counter that changes whenever the table's columns may have.
+        """
+        return self._table_generations.get(full_table_name, 0)
+
+    def table_exists(self, full_table_name: str) -> bool:
+        """Determine if the target table already exists.
+        Args:
+            full_table_name: the target table name.
+        Returns:
+            True if table exists, False if not.
+        """
+        if full_table_name in self._table_columns_cache:
+            self.table_cache_hits += 1
+            return True
+
+        self.table_cache_misses += 1
+        return super().table_exists(full_table_name)
+
+    def get_table_columns(
+        self, full_table_name: str, column_names: list[str] | None = None
+    ) -> dict[str, sqlalchemy.Column]:
+        """Return the table columns, reflecting the table on first use.
+        Args:
+            full_table_name: Fully qualified table name.
+            column_names: A list of column names to filter to.
+        Returns:
+            An ordered dict of column objects.
+        """
+        columns = self._table_columns_cache.get(full_table_name)
+        if columns is None:
+            self.table_cache_misses += 1
+            columns = super().get_table_columns(full_table_name)
+            self._table_columns_cache[full_table_name] = columns
+        else:
+            self.table_cache_hits += 1
+
+        if not column_names:
+            return dict(columns)
+        selected_names = {name.casefold() for name in column_names}
+        return {
+            name: column
+            for name, column in columns.items()
+            if name.casefold() in selected_names
+        }
+
     def create_table_with_records(
         self,
         full_table_name: Optional[str],
@@ -73,6 +171,54 @@ class mssqlConnector(SQLConnector):
         )
         return str(connection_url)
 
+    def get_engine_kwargs(self, config: dict) -> Dict[str, Any]:
+        """Return the connection pool settings for the SQLAlchemy engine.
+        Args:
+            config: The configuration for the connector.
+        Returns:
+            Keyword arguments for `sqlalchemy.create_engine`.
+        """
+        engine_kwargs: Dict[str, Any] = {}
+        for setting in ("pool_size", "max_overflow", "pool_recycle"):
+            if config.get(setting) is not None:
+                engine_kwargs[setting] = config[setting]
+        if config.get("pool_pre_ping"):
+            engine_kwargs["pool_pre_ping"] = True
+        return engine_kwargs
+
+    def get_connect_args(self, config: dict) -> Dict[str, Any]:
+        """Return the arguments passed to `pymssql.connect`.
+        Args:
+            config: The configuration for the connector.
+        Returns:
+            The driver connect arguments.
+        """
+        connect_args: Dict[str, Any] = {}
+        if config.get("tds_version"):
+            connect_args["tds_version"] = config["tds_version"]
+        if config.get("login_timeout") is not None:
+            connect_args["login_timeout"] = config["login_timeout"]
+        if config.get("query_timeout") is not None:
+            connect_args["timeout"] = config["query_timeout"]
+        if config.get("autocommit") is not None:
+            connect_args["autocommit"] = config["autocommit"]
+        if config.get("datetime_type") in ("datetime2", "datetimeoffset"):
+            # Send microseconds and offsets instead of DATETIME's milliseconds
+            connect_args["use_datetime2"] = True
+        return connect_args
+
+    def create_sqlalchemy_engine(self) -> sqlalchemy.engine.Engine:
+        """Return a new SQLAlchemy engine configured from the target settings.
+        Returns:
+            A newly created SQLAlchemy engine object.
+        """
+        return sqlalchemy.create_engine(
+            self.sqlalchemy_url,
+            echo=False,
+            connect_args=self.get_connect_args(self.config),
+            **self.get_engine_kwargs(self.config),
+        )
+
     def create_empty_table(
         self,
         full_table_name: str,
@@ -80,6 +226,7 @@ class mssqlConnector(SQLConnector):
         primary_keys: list[str] | None = None,
         partition_keys: list[str] | None = None,
         as_temp_table: bool = False,
+        column_types: Dict[str, sqlalchemy.types.TypeEngine] | None = None,
     ) -> None:
         """Create an empty target table.
         Args:
@@ -88,6 +235,8 @@ class mssqlConnector(SQLConnector):
             primary_keys: list of key properties.
             partition_keys: list of partition keys.
             as_temp_table: True to create a temp table.
+            column_types: types to use instead of those of the JSON schema,
+                such as types inferred from the data.
         Raises:
             NotImplementedError: if temp tables are unsupported and as_temp_table=True.
             RuntimeError: if a variant schema is passed with no properties defined.
@@ -99,7 +248,7 @@ class mssqlConnector(SQLConnector):
 
         _, schema_name, table_name = self.parse_full_table_name(full_table_name)
         meta = sqlalchemy.MetaData()
-        columns: list[sqlalchemy.Column] = []
+        columns: list[sqlalchemy.schema.SchemaItem] = []
         primary_keys = primary_keys or []
         try:
             properties: dict = schema["properties"]
@@ -110,11 +259,11 @@ class mssqlConnector(SQLConnector):
         for property_name, property_jsonschema in properties.items():
             is_primary_key = property_name in primary_keys
 
-            columntype = self.to_sql_type(property_jsonschema)
-
-            # In MSSQL, Primary keys can not be more than 900 bytes. Setting at 255
-            if isinstance(columntype, sqlalchemy.types.VARCHAR) and is_primary_key:
-                columntype = sqlalchemy.types.VARCHAR(255)
+            columntype = self._get_new_column_type(
+                property_jsonschema,
+                is_primary_key,
+                (column_types or {}).get(property_name),
+            )
 
             if is_primary_key:
                 columns.append(
@@ -127,13 +276,59 @@ class mssqlConnector(SQLConnector):
                     sqlalchemy.Column(property_name, columntype, primary_key=False)
                 )
 
+        columnstore = self.config.get("columnstore", False)
+        if columnstore and primary_keys:
+            # The columnstore is the clustered index, so the key gets its own
+            columns.append(
+                sqlalchemy.PrimaryKeyConstraint(*primary_keys, mssql_clustered=False)
+            )
+
         _ = sqlalchemy.Table(table_name, meta, *columns, schema=schema_name)
         meta.create_all(self._engine)
+        if columnstore:
+            self.connection.execute(
+                f"CREATE CLUSTERED COLUMNSTORE INDEX cci_{table_name} "
+                f"ON {full_table_name}"
+            )
+        self.invalidate_table_cache(full_table_name)
 
-    def merge_sql_types(  # noqa
+    def _get_new_column_type(
+        self,
+        jsonschema_type: dict,
+        is_primary_key: bool,
+        given_type: sqlalchemy.types.TypeEngine | None = None,
+    ) -> sqlalchemy.types.TypeEngine:
+        """Return the type of a column of a new table.
+        Args:
+            jsonschema_type: The JSON schema of the property.
+            is_primary_key: Whether the column is part of the primary key.
+            given_type: A type to use instead of that of the JSON schema.
+        Returns:
+            The SQL type.
+        """
+        if given_type is None:
+            columntype = self.to_sql_type(jsonschema_type)
+            # In MSSQL, Primary keys can not be more than 900 bytes. Setting at 255
+            if isinstance(columntype, sqlalchemy.types.VARCHAR) and is_primary_key:
+                columntype = sqlalchemy.types.VARCHAR(255)
+            return columntype
+
+        # Given key types keep their length if it is at most 255
+        if (
+            is_primary_key
+            and isinstance(given_type, sqlalchemy.types.String)
+            and (given_type.length is None or given_type.length > 255)
+        ):
+            return type(given_type)(255)
+        return given_type
+
+    def merge_sql_types(
         self, sql_types: list[sqlalchemy.types.TypeEngine]
-    ) -> sqlalchemy.types.TypeEngine:  # noqa
+    ) -> sqlalchemy.types.TypeEngine:
         """Return a compatible SQL type for the selected type list.
+        The types are joined pairwise in the widening lattice of
+        `target_mssql.type_lattice`, so the result holds the values of every
+        input type. If one of the inputs already does, it is returned as is.
         Args:
             sql_types: List of SQL types.
         Returns:
@@ -144,69 +339,186 @@ class mssqlConnector(SQLConnector):
         if not sql_types:
             raise ValueError("Expected at least one member in `sql_types` argument.")
 
-        if len(sql_types) == 1:
-            return sql_types[0]
+        keys = [type_key(sql_type) for sql_type in sql_types]
+        merged_key = keys[0]
+        for key in keys[1:]:
+            merged_key = join_keys(merged_key, key)
+        for key, sql_type in zip(keys, sql_types):
+            if key == merged_key:
+                return sql_type
+        return type_of_key(merged_key)
+
+    def prepare_table(
+        self,
+        full_table_name: str,
+        schema: dict,
+        primary_keys: list[str],
+        partition_keys: list[str] | None = None,
+        as_temp_table: bool = False,
+        column_types: Dict[str, sqlalchemy.types.TypeEngine] | None = None,
+    ) -> None:
+        """Adapt target table to provided schema if possible.
 
-        # Gathering Type to match variables
-        # sent in _adapt_column_type
-        current_type = sql_types[0]
-        # sql_type = sql_types[1]
+        All new columns and type changes are applied together, see
+        `apply_column_changes`.
+        Args:
+            full_table_name: the target table name.
+            schema: the JSON Schema for the table.
+            primary_keys: list of key properties.
+            partition_keys: list of partition keys.
+            as_temp_table: True to create a temp table.
+            column_types: types to use instead of those of the JSON schema,
+                such as types inferred from the data. Existing columns are
+                widened to hold them, except for primary key columns.
+        """
+        if not self.table_exists(full_table_name=full_table_name):
+            self.create_empty_table(
+                full_table_name=full_table_name,
+                schema=schema,
+                primary_keys=primary_keys,
+                partition_keys=partition_keys,
+                as_temp_table=as_temp_table,
+                column_types=column_types,
+            )
+            return
 
-        # Getting the length of each type
-        # current_type_len: int = getattr(sql_types[0], "length", 0)
-        sql_type_len: int = getattr(sql_types[1], "length", 0)
-        if sql_type_len is None:
-            sql_type_len = 0
+        existing_columns = {
+            name.casefold(): column
+            for name, column in self.get_table_columns(full_table_name).items()
+        }
+        # Primary key columns cannot be altered while the constraint exists
+        key_columns = {name.casefold() for name in primary_keys}
+        new_columns: list[Tuple[str, sqlalchemy.types.TypeEngine]] = []
+        altered_columns: list[Tuple[str, sqlalchemy.types.TypeEngine]] = []
+        for property_name, property_def in schema["properties"].items():
+            given_type = (column_types or {}).get(property_name)
+            sql_type = given_type or self.to_sql_type(property_def)
+            column = existing_columns.get(property_name.casefold())
+            if column is None:
+                new_columns.append((property_name, sql_type))
+                continue
+
+            if property_name.casefold() in key_columns or (
+                given_type is None
+                and self._keeps_column_type(column.type, property_def)
+            ):
+                continue
+            compatible_sql_type = self._get_column_type_change(column.type, sql_type)
+            if compatible_sql_type is not None:
+                altered_columns.append((column.name, compatible_sql_type))
+
+        if new_columns or altered_columns:
+            self.apply_column_changes(full_table_name, new_columns, altered_columns)
+
+    def apply_column_changes(
+        self,
+        full_table_name: str,
+        new_columns: List[Tuple[str, sqlalchemy.types.TypeEngine]],
+        altered_columns: List[Tuple[str, sqlalchemy.types.TypeEngine]],
+    ) -> None:
+        """Add and widen columns of a table in a single transaction.
 
-        # Convert the two types given into a sorted list
-        # containing the best conversion classes
-        sql_types = self._sort_types(sql_types)
+        New columns share one ALTER TABLE ... ADD statement. SQL Server only
+        allows one column per ALTER COLUMN, so each type change is its own
+        statement.
+        Args:
+            full_table_name: The target table name.
+            new_columns: Name and type of each column to add.
+            altered_columns: Name and new type of each column to alter.
+        Raises:
+            NotImplementedError: if adding or altering columns is not supported.
+            RuntimeError: if the DDL fails, in which case none of it is applied.
+        """
+        if new_columns and not self.allow_column_add:
+            raise NotImplementedError("Adding columns is not supported.")
+        if altered_columns and not self.allow_column_alter:
+            raise NotImplementedError(
+                "Altering columns is not supported. "
+                f"Could not alter columns of '{full_table_name}': "
+                f"{', '.join(name for name, _ in altered_columns)}."
+            )
 
-        # If greater than two evaluate the first pair then on down the line
-        if len(sql_types) > 2:
-            return self.merge_sql_types(
-                [self.merge_sql_types([sql_types[0], sql_types[1]])] + sql_types[2:]
+        statements = []
+        if new_columns:
+            column_clauses = ", ".join(
+                f"{name} {sql_type.compile(dialect=DDL_DIALECT)} NULL"
+                for name, sql_type in new_columns
+            )
+            statements.append(f"ALTER TABLE {full_table_name} ADD {column_clauses}")
+        for name, sql_type in altered_columns:
+            statements.append(
+                f"ALTER TABLE {full_table_name} "
+                f"ALTER COLUMN {name} {sql_type.compile(dialect=DDL_DIALECT)}"
             )
 
-        assert len(sql_types) == 2
-        # Get the generic type class
-        for opt in sql_types:
-            # Get the length
-            opt_len: int = getattr(opt, "length", 0)
-            generic_type = type(opt.as_generic())
-
-            if isinstance(generic_type, type):
-                if issubclass(
-                    generic_type,
-                    (sqlalchemy.types.String, sqlalchemy.types.Unicode),
-                ):
-                    # If length None or 0 then is varchar max ?
-                    if (
-                        (opt_len is None)
-                        or (opt_len == 0)
-                        or (opt_len >= current_type.length)
-                    ):
-                        return opt
-                elif isinstance(
-                    generic_type,
-                    (sqlalchemy.types.String, sqlalchemy.types.Unicode),
-                ):
-                    # If length None or 0 then is varchar max ?
-                    if (
-                        (opt_len is None)
-                        or (opt_len == 0)
-                        or (opt_len >= current_type.length)
-                    ):
-                        return opt
-                # If best conversion class is equal to current type
-                # return the best conversion class
-                elif str(opt) == str(current_type):
-                    return opt
-
-        raise ValueError(
-            f"Unable to merge sql types: {', '.join([str(t) for t in sql_types])}"
+        start_time = time.perf_counter()
+        try:
+            with self.connection.begin():
+                for statement in statements:
+                    self.connection.execute(statement)
+        except Exception as e:
+            raise RuntimeError(
+                f"Could not apply schema changes to table '{full_table_name}'."
+            ) from e
+        finally:
+            self.invalidate_table_cache(full_table_name)
+
+        self.logger.info(
+            "Added %d and altered %d columns of %s in %.3f seconds",
+            len(new_columns),
+            len(altered_columns),
+            full_table_name,
+            time.perf_counter() - start_time,
+        )
+
+    def _keeps_column_type(
+        self, current_type: sqlalchemy.types.TypeEngine, jsonschema_type: dict
+    ) -> bool:
+        """Return True if a column already holds what its JSON schema declares.
+        Strings without a `maxLength` fit any existing string column, as the
+        schema does not say they are long. Likewise integers fit any integer
+        or decimal column, numbers any decimal column, and booleans BIT
+        columns. Only types inferred from the data widen such columns.
+        Args:
+            current_type: The current column type.
+            jsonschema_type: The JSON schema of the property.
+        Returns:
+            True if the column should be left as it is.
+        """
+        if isinstance(current_type, mssql.BIT):
+            return self._jsonschema_type_check(jsonschema_type, ("boolean",))
+        if isinstance(current_type, sqlalchemy.types.Numeric):
+            return self._jsonschema_type_check(jsonschema_type, ("integer", "number"))
+        if isinstance(current_type, sqlalchemy.types.Integer):
+            return self._jsonschema_type_check(jsonschema_type, ("integer",))
+
+        declared_type = self.to_sql_type(jsonschema_type)
+        return (
+            isinstance(declared_type, sqlalchemy.types.String)
+            and not isinstance(declared_type, sqlalchemy.types.Text)
+            and declared_type.length is None
+            and "maxLength" not in jsonschema_type
+            and isinstance(current_type, sqlalchemy.types.String)
         )
 
+    def _get_column_type_change(
+        self,
+        current_type: sqlalchemy.types.TypeEngine,
+        sql_type: sqlalchemy.types.TypeEngine,
+    ) -> Optional[sqlalchemy.types.TypeEngine]:
+        """Return the type a column must be altered to, if any.
+        Args:
+            current_type: The current column type.
+            sql_type: The new SQLAlchemy type.
+        Returns:
+            The compatible type, or None when the column can stay as it is.
+        """
+        current_key = type_key(current_type)
+        merged_key = join_keys(current_key, type_key(sql_type))
+        if merged_key == current_key:
+            return None
+        return self.merge_sql_types([current_type, sql_type])
+
     def _adapt_column_type(
         self,
         full_table_name: str,
@@ -218,54 +530,15 @@ class mssqlConnector(SQLConnector):
             full_table_name: The target table name.
             column_name: The target column name.
             sql_type: The new SQLAlchemy type.
-        Raises:
-            NotImplementedError: if altering columns is not supported.
         """
         current_type: sqlalchemy.types.TypeEngine = self._get_column_type(
             full_table_name, column_name
         )
-
-        # Check if the existing column type and the sql type are the same
-        if str(sql_type) == str(current_type):
-            # The current column and sql type are the same
-            # Nothing to do
-            return
-
-        # Not the same type, generic type or compatible types
-        # calling merge_sql_types for assistnace
-        compatible_sql_type = self.merge_sql_types([current_type, sql_type])
-
-        if str(compatible_sql_type).split(" ")[0] == str(current_type).split(" ")[0]:
-            # Nothing to do
-            return
-
-        if not self.allow_column_alter:
-            raise NotImplementedError(
-                "Altering columns is not supported. "
-                f"Could not convert column '{full_table_name}.{column_name}' "
-                f"from '{current_type}' to '{compatible_sql_type}'."
-            )
-        try:
-            self.connection.execute(
-                f"""ALTER TABLE { str(full_table_name) }
-                ALTER COLUMN { str(column_name) } { str(compatible_sql_type) }"""
+        compatible_sql_type = self._get_column_type_change(current_type, sql_type)
+        if compatible_sql_type is not None:
+            self.apply_column_changes(
+                full_table_name, [], [(column_name, compatible_sql_type)]
             )
-        except Exception as e:
-            raise RuntimeError(
-                f"Could not convert column '{full_table_name}.{column_name}' "
-                f"from '{current_type}' to '{compatible_sql_type}'."
-            ) from e
-
-        # self.connection.execute(
-        #     sqlalchemy.DDL(
-        #         "ALTER TABLE %(table)s ALTER COLUMN %(col_name)s %(col_type)s",
-        #         {
-        #             "table": full_table_name,
-        #             "col_name": column_name,
-        #             "col_type": compatible_sql_type,
-        #         },
-        #     )
-        # )
 
     def _create_empty_column(
         self,
@@ -278,30 +551,8 @@ class mssqlConnector(SQLConnector):
             full_table_name: The target table name.
             column_name: The name of the new column.
             sql_type: SQLAlchemy type engine to be used in creating the new column.
-        Raises:
-            NotImplementedError: if adding columns is not supported.
         """
-        if not self.allow_column_add:
-            raise NotImplementedError("Adding columns is not supported.")
-
-        create_column_clause = sqlalchemy.schema.CreateColumn(
-            sqlalchemy.Column(
-                column_name,
-                sql_type,
-            )
-        )
-
-        try:
-            self.connection.execute(
-                f"""ALTER TABLE { str(full_table_name) }
-                ADD { str(create_column_clause) } """
-            )
-
-        except Exception as e:
-            raise RuntimeError(
-                f"Could not create column '{create_column_clause}' "
-                f"on table '{full_table_name}'."
-            ) from e
+        self.apply_column_changes(full_table_name, [(column_name, sql_type)], [])
 
     def _jsonschema_type_check(
         self, jsonschema_type: dict, type_check: tuple[str]
@@ -339,7 +590,10 @@ class mssqlConnector(SQLConnector):
             if datelike_type:
                 if datelike_type == "date-time":
                     return cast(
-                        sqlalchemy.types.TypeEngine, sqlalchemy.types.DATETIME()
+                        sqlalchemy.types.TypeEngine,
+                        DATETIME_TYPES[
+                            self.config.get("datetime_type") or "datetime"
+                        ](),
                     )
                 if datelike_type in "time":
                     return cast(sqlalchemy.types.TypeEngine, sqlalchemy.types.TIME())
@@ -366,24 +620,76 @@ class mssqlConnector(SQLConnector):
         if self._jsonschema_type_check(jsonschema_type, ("boolean",)):
             return cast(sqlalchemy.types.TypeEngine, mssql.VARCHAR(1))
 
-        if self._jsonschema_type_check(jsonschema_type, ("object",)):
-            return cast(sqlalchemy.types.TypeEngine, sqlalchemy.types.VARCHAR())
-
-        if self._jsonschema_type_check(jsonschema_type, ("array",)):
-            return cast(sqlalchemy.types.TypeEngine, sqlalchemy.types.JSON())
+        # Objects and arrays are stored as JSON text, which ISJSON() accepts
+        if self._jsonschema_type_check(jsonschema_type, ("object", "array")):
+            return cast(sqlalchemy.types.TypeEngine, mssql.NVARCHAR())
 
         return cast(sqlalchemy.types.TypeEngine, sqlalchemy.types.VARCHAR())
 
-    def create_temp_table_from_table(self, from_table_name):
-        """Temp table from another table."""
+    def infer_sql_type(
+        self, jsonschema_type: dict, profile: ColumnProfile
+    ) -> sqlalchemy.types.TypeEngine:
+        """Return a SQL type sized to the values seen for a property.
+        Strings without a format or `maxLength` get a length fitting the
+        longest value, as NVARCHAR if any is not ASCII. Integers get the
+        smallest integer type, numbers the smallest NUMERIC, and booleans BIT.
+        Other properties, and properties without values, keep the type of
+        `to_sql_type`.
+        Args:
+            jsonschema_type: The JSON Schema object.
+            profile: The profile of the values of the property.
+        Returns:
+            The SQL type.
+        """
+        sql_type = self.to_sql_type(jsonschema_type)
+        if not profile.value_count:
+            return sql_type
+
+        if self._jsonschema_type_check(jsonschema_type, ("string",)):
+            if (
+                get_datelike_property_type(jsonschema_type)
+                or jsonschema_type.get("maxLength") is not None
+            ):
+                return sql_type
+            if profile.has_unicode:
+                return cast(
+                    sqlalchemy.types.TypeEngine, mssql.NVARCHAR(profile.string_length)
+                )
+            return cast(
+                sqlalchemy.types.TypeEngine,
+                sqlalchemy.types.VARCHAR(profile.string_length),
+            )
+
+        if self._jsonschema_type_check(jsonschema_type, ("integer",)):
+            return cast(
+                sqlalchemy.types.TypeEngine,
+                INTEGER_TYPES[profile.integer_type](),
+            )
+
+        if self._jsonschema_type_check(jsonschema_type, ("number",)):
+            if self.config.get("prefer_float_over_numeric", False):
+                return sql_type
+            precision, scale = profile.numeric_precision_and_scale
+            return cast(
+                sqlalchemy.types.TypeEngine, sqlalchemy.types.NUMERIC(precision, scale)
+            )
+
+        if self._jsonschema_type_check(jsonschema_type, ("boolean",)):
+            return cast(sqlalchemy.types.TypeEngine, mssql.BIT())
+
+        return sql_type
+
+    def create_temp_table_from_table(self, from_table_name, tmp_full_table_name=None):
+        """Temp table from another table, named after it unless a name is given."""
 
         db_name, schema_name, table_name = self.parse_full_table_name(from_table_name)
         full_table_name = (
             f"{schema_name}.{table_name}" if schema_name else f"{table_name}"
         )
-        tmp_full_table_name = (
-            f"{schema_name}.#{table_name}" if schema_name else f"#{table_name}"
-        )
+        if tmp_full_table_name is None:
+            tmp_full_table_name = (
+                f"{schema_name}.#{table_name}" if schema_name else f"#{table_name}"
+            )
 
         droptable = f"DROP TABLE IF EXISTS {tmp_full_table_name}"
         self.connection.execute(droptable)
@@ -395,3 +701,133 @@ class mssqlConnector(SQLConnector):
         """  # nosec
 
         self.connection.execute(ddl)
+
+    def create_staging_index(
+        self, tmp_full_table_name: str, key_columns: List[str]
+    ) -> None:
+        """Create a clustered index on the key columns of a staging table."""
+        self.connection.execute(
+            f"""CREATE CLUSTERED INDEX ix_staging_keys
+            ON {tmp_full_table_name} ({", ".join(key_columns)})"""
+        )
+
+    def drop_staging_index(self, tmp_full_table_name: str) -> None:
+        """Drop the clustered index of a staging table."""
+        self.connection.execute(f"DROP INDEX ix_staging_keys ON {tmp_full_table_name}")
+
+    def update_table_statistics(self, full_table_name: str) -> None:
+        """Update the statistics of a table."""
+        self.connection.execute(f"UPDATE STATISTICS {full_table_name}")
+
+    def get_nonclustered_indexes(self, full_table_name: str) -> List[str]:
+        """Return the enabled, non-unique nonclustered indexes of a table.
+        Unique indexes are left out, as disabling them would stop enforcing
+        their constraint.
+        Args:
+            full_table_name: the table name.
+        Returns:
+            The index names.
+        """
+        result = self.connection.execute(
+            sqlalchemy.text(
+                """SELECT name FROM sys.indexes
+                WHERE object_id = OBJECT_ID(:table_name)
+                AND type_desc = 'NONCLUSTERED'
+                AND is_unique = 0
+                AND is_disabled = 0"""
+            ),
+            {"table_name": full_table_name},
+        )
+        return [row[0] for row in result.fetchall()]
+
+    def disable_index(self, full_table_name: str, index_name: str) -> None:
+        """Disable an index of a table."""
+        self.connection.execute(
+            f"ALTER INDEX {index_name} ON {full_table_name} DISABLE"
+        )
+
+    def rebuild_index(self, full_table_name: str, index_name: str) -> None:
+        """Rebuild an index of a table, enabling it if it was disabled."""
+        self.connection.execute(
+            f"ALTER INDEX {index_name} ON {full_table_name} REBUILD"
+        )
+
+    def get_clustered_columnstore_index(self, full_table_name: str) -> Optional[str]:
+        """Return the name of the clustered columnstore index of a table, if any.
+        Args:
+            full_table_name: the table name.
+        Returns:
+            The index name, or None for rowstore tables.
+        """
+        result = self.connection.execute(
+            sqlalchemy.text(
+                """SELECT name FROM sys.indexes
+                WHERE object_id = OBJECT_ID(:table_name)
+                AND type_desc = 'CLUSTERED COLUMNSTORE'"""
+            ),
+            {"table_name": full_table_name},
+        )
+        row = result.fetchone()
+        return row[0] if row else None
+
+    def reorganize_columnstore_index(
+        self, full_table_name: str, index_name: str
+    ) -> None:
+        """Compress the open delta rowgroups of a columnstore index."""
+        self.connection.execute(
+            f"ALTER INDEX {index_name} ON {full_table_name} "
+            "REORGANIZE WITH (COMPRESS_ALL_ROW_GROUPS = ON)"
+        )
+
+    def drop_table(self, full_table_name: str) -> None:
+        """Drop a table if it exists.
+        Args:
+            full_table_name: the table name.
+        """
+        try:
+            self.connection.execute(f"DROP TABLE IF EXISTS {full_table_name}")
+        finally:
+            self.invalidate_table_cache(full_table_name)
+
+    def swap_tables(
+        self,
+        full_table_name: str,
+        shadow_table_name: str,
+        keep_replaced_table: bool = False,
+    ) -> None:
+        """Replace a table with its shadow table in a single transaction.
+        The table is renamed to `<table>__replaced`, which is then dropped
+        unless `keep_replaced_table` is set. A table kept by a previous swap
+        is dropped first.
+        Args:
+            full_table_name: the table to replace.
+            shadow_table_name: the table taking its place.
+            keep_replaced_table: whether to keep the replaced table.
+        """
+        _, schema_name, table_name = self.parse_full_table_name(full_table_name)
+        replaced_table_name = f"{table_name}__replaced"
+        replaced_full_table_name = (
+            f"{schema_name}.{replaced_table_name}"
+            if schema_name
+            else replaced_table_name
+        )
+        try:
+            with self.connection.begin():
+                self.connection.execute(
+                    f"DROP TABLE IF EXISTS {replaced_full_table_name}"
+                )
+                self.connection.execute(
+                    f"IF OBJECT_ID('{full_table_name}', 'U') IS NOT NULL "
+                    f"EXEC sp_rename '{full_table_name}', '{replaced_table_name}'"
+                )
+                self.connection.execute(
+                    f"EXEC sp_rename '{shadow_table_name}', '{table_name}'"
+                )
+                if not keep_replaced_table:
+                    # Nothing was renamed when the table did not exist yet
+                    self.connection.execute(
+                        f"DROP TABLE IF EXISTS {replaced_full_table_name}"
+                    )
+        finally:
+            for name in (full_table_name, shadow_table_name, replaced_full_table_name):
+                self.invalidate_table_cache(name)
@@ -0,0 +1,99 @@
+"""Row projection from conformed records to positional row tuples."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Converter = Callable[[Any], Any]
+JsonSerializer = Callable[[Any], str]
+
+
+def json_dumps_stdlib(value: Any) -> str:
+    """Serialize a value to JSON with the standard library."""
+    return json.dumps(value, default=str)
+
+
+def json_dumps_orjson(value: Any) -> str:
+    """Serialize a value to JSON with orjson."""
+    try:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    except TypeError:
+        # orjson rejects e.g. integers wider than 64 bits
+        return json_dumps_stdlib(value)
+
+
+def get_json_serializer() -> JsonSerializer:
+    """Return the fastest available JSON serializer (orjson if installed)."""
+    if orjson is not None:
+        return json_dumps_orjson
+    return json_dumps_stdlib
+
+
+def json_converter(serializer: JsonSerializer) -> Converter:
+    """Return a converter serializing nested values, passing scalars through."""
+
+    def serialize(value: Any) -> Any:
+        if isinstance(value, (dict, list)):
+            return serializer(value)
+        return value
+
+    return serialize
+
+
+def coerce_boolean(value: Any) -> Any:
+    """Convert booleans to the '1'/'0' stored in VARCHAR(1) columns."""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return value
+
+
+class RowProjector:
+    """Projects conformed records onto tuples in a fixed column order.
+
+    The projector is compiled once from the table columns, so the per-row work
+    is a lookup per column plus a call for the few columns needing conversion.
+    """
+
+    def __init__(
+        self,
+        column_names: Sequence[str],
+        converters: Dict[str, Converter] | None = None,
+    ) -> None:
+        """Compile a projector.
+
+        Args:
+            column_names: The columns, in the order rows are emitted.
+            converters: Conversion functions for the columns that need them.
+        """
+        self.column_names: Tuple[str, ...] = tuple(column_names)
+        converters = converters or {}
+        self._converters: List[Tuple[int, Converter]] = [
+            (index, converters[name])
+            for index, name in enumerate(self.column_names)
+            if name in converters
+        ]
+
+    def __call__(self, record: dict) -> Tuple[Any, ...]:
+        """Project a record, filling columns missing from it with None.
+
+        Args:
+            record: A record with conformed property names.
+
+        Returns:
+            A tuple of values in `column_names` order.
+        """
+        if not self._converters:
+            return tuple(map(record.get, self.column_names))
+
+        values = list(map(record.get, self.column_names))
+        for index, convert in self._converters:
+            value = values[index]
+            if value is not None:
+                values[index] = convert(value)
+        return tuple(values)
@@ -2,21 +2,132 @@
 
 from __future__ import annotations
 
+import contextlib
+import functools
+import hashlib
+import itertools
 import json
+import os
 import re
-from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+import tempfile
+import time
+import uuid
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Sized,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import sqlalchemy
 from singer_sdk.connectors.sql import SQLConnector
 from singer_sdk.helpers._conformers import replace_leading_digit
+from singer_sdk.helpers._typing import (
+    DatetimeErrorTreatmentEnum,
+    get_datelike_property_type,
+    handle_invalid_timestamp_in_record,
+)
 from singer_sdk.sinks.sql import SQLSink
 from sqlalchemy import Column
 
+from target_mssql.columnar import (
+    ColumnarProjector,
+    ColumnConverter,
+    coerce_boolean_column,
+    json_column_converter,
+)
 from target_mssql.connector import mssqlConnector
+from target_mssql.projector import (
+    Converter,
+    JsonSerializer,
+    RowProjector,
+    coerce_boolean,
+    get_json_serializer,
+    json_converter,
+)
+from target_mssql.staging_file import DEFAULT_CHUNK_SIZE, StagingFileWriter
+from target_mssql.timestamps import get_datelike_parsers
+from target_mssql.type_inference import profile_records
 
 if TYPE_CHECKING:
+    from concurrent.futures import Future
+
     from singer_sdk.plugin_base import PluginBase
 
+    from target_mssql.target import Targetmssql
+
+# SQL Server limits for a single INSERT ... VALUES statement
+MAX_STATEMENT_PARAMETERS = 2100
+MAX_VALUES_ROWS = 1000
+# Rows sent per INSERT BULK operation
+BULK_COPY_CHUNK_SIZE = 10000
+# Rows a bulk load needs to go straight into a compressed columnstore rowgroup
+COLUMNSTORE_MIN_ROWGROUP_ROWS = 102400
+# Load methods using the bulk-load API, which can fill compressed rowgroups
+BULK_LOAD_METHODS = ("bulk_copy", "bulk_insert")
+# Distinct record key sets remembered by conform_record
+MAX_CACHED_RECORD_KEY_SETS = 1024
+# How the staging table of keyed streams is indexed before merging
+STAGING_HEAP = "heap"
+STAGING_INDEX_BEFORE_LOAD = "index_before_load"
+STAGING_INDEX_AFTER_LOAD = "index_after_load"
+
+T = TypeVar("T")
+
+
+def reorder_rows(
+    rows: Iterable[Tuple[Any, ...]], column_ids: Sequence[int], column_count: int
+) -> Iterator[Tuple[Any, ...]]:
+    """Rearrange rows into table column order, given each value's ordinal."""
+    # Positions past the end of a row pick the None appended to it
+    missing = len(column_ids)
+    positions = [missing] * column_count
+    for index, column_id in enumerate(column_ids):
+        positions[column_id - 1] = index
+    for row in rows:
+        padded_row = row + (None,)
+        yield tuple([padded_row[position] for position in positions])
+
+
+def iter_chunks(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Consume an iterable lazily in lists of at most `size` items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class CountedRows:
+    """Rows of a batch that are projected lazily, but counted up front."""
+
+    def __init__(self, rows: Iterable[Tuple[Any, ...]], count: int) -> None:
+        """Wrap lazily projected rows.
+        Args:
+            rows: The rows, which may only be iterated once.
+            count: The number of rows.
+        """
+        self.rows = rows
+        self.count = count
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        """Return an iterator over the rows."""
+        return iter(self.rows)
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return self.count
+
 
 class mssqlSink(SQLSink):
     """mssql target sink class."""
@@ -31,9 +142,61 @@ class mssqlSink(SQLSink):
         key_properties: list[str] | None,
         connector: SQLConnector | None = None,
     ) -> None:
+        self._conformed_names: Dict[Tuple[str, Optional[str]], str] = {}
+        self._conformed_record_keys: Dict[Tuple[str, ...], List[str]] = {}
+        self._schema_caches: Dict[str, Dict[str, Any]] = {}
+        self._schema_fingerprints: Dict[int, Tuple[dict, str]] = {}
+        self._active_schema_fingerprint: Optional[str] = None
+        self._insert_statement_cache: Dict[
+            Tuple[str, Tuple[str, ...], int, bool], str
+        ] = {}
         super().__init__(target, stream_name, schema, key_properties)
+        self._target = cast("Targetmssql", target)
+        # Load of the previous batch when draining on the target's thread pool
+        self._pending_drain: Optional[Future] = None
         if self._config.get("table_prefix"):
             self.stream_name = self._config.get("table_prefix") + stream_name
+        self._bulk_copy_unavailable_logged = False
+        # Schema fingerprint, source table and its generation the staging
+        # table was created for, if it exists
+        self._staging_table_key: Optional[Tuple[str, str, int]] = None
+        self._staging_table_source: Optional[str] = None
+        self._staging_table_indexed = False
+        # Serializer for object and array columns, may be replaced by subclasses
+        self.json_serializer: JsonSerializer = get_json_serializer()
+
+    @property
+    def max_size(self) -> int:
+        """Get max batch size.
+        Columnstore tables loaded with a bulk load method need batches large
+        enough to fill a compressed rowgroup. INSERT statements always load
+        into delta rowgroups, so batches stay at the default size.
+        Returns:
+            Max number of records to batch before `is_full=True`
+        """
+        if (
+            self.config.get("columnstore", False)
+            and self.config.get("load_method") in BULK_LOAD_METHODS
+        ):
+            return max(super().max_size, COLUMNSTORE_MIN_ROWGROUP_ROWS)
+        return super().max_size
+
+    def setup(self) -> None:
+        """Set up the schema and table of the stream.
+        With `infer_column_types`, a missing table is only created with the
+        first batch, whose values decide the column types. With
+        `full_refresh`, the sink takes over swapping in the shadow table from
+        any sink it replaces after a schema change.
+        """
+        if self.config.get("full_refresh", False):
+            self._target.shadow_table_owners[self.shadow_table_name] = self
+        if self.config.get("infer_column_types", False) and not (
+            self.connector.table_exists(self.full_table_name)
+        ):
+            if self.schema_name:
+                self.connector.prepare_schema(self.schema_name)
+            return
+        super().setup()
 
     # Copied purely to help with type hints
     @property
@@ -71,21 +234,6 @@ class mssqlSink(SQLSink):
         # Schema name not detected.
         return None
 
-    def preprocess_record(self, record: dict, context: dict) -> dict:
-        """Process incoming record and return a modified result.
-        Args:
-            record: Individual record in the stream.
-            context: Stream partition or context dictionary.
-        Returns:
-            A new, processed record.
-        """
-        keys = record.keys()
-        for key in keys:
-            if type(record[key]) in [list, dict]:
-                record[key] = json.dumps(record[key], default=str)
-
-        return record
-
     def bulk_insert_records(
         self,
         full_table_name: str,
@@ -94,9 +242,9 @@ class mssqlSink(SQLSink):
         is_temp_table: bool = False,
     ) -> Optional[int]:
         """Bulk insert records to an existing destination table.
-        The default implementation uses a generic SQLAlchemy bulk insert operation.
-        This method may optionally be overridden by developers in order to provide
-        faster, native bulk uploads.
+        Records are sent as multi-row INSERT ... VALUES statements sized to the
+        SQL Server parameter limits, or over the TDS bulk-load protocol when
+        `load_method` is `bulk_copy`.
         Args:
             full_table_name: the target table name.
             schema: the JSON schema for the new table, to be used when inferring column
@@ -104,109 +252,996 @@ class mssqlSink(SQLSink):
             records: the input records.
             is_temp_table: whether the table is a temp table.
         Returns:
-            True if table exists, False if not, None if unsure or undetectable.
+            The number of records inserted.
         """
-        insert_sql = self.generate_insert_statement(
+        projector = self.get_row_projector(schema)
+        return self.insert_rows(
             full_table_name,
-            schema,
+            projector.column_names,
+            map(projector, records),
+            is_temp_table=is_temp_table,
         )
-        if isinstance(insert_sql, str):
-            insert_sql = sqlalchemy.text(insert_sql)
 
-        self.logger.info("Inserting with SQL: %s", insert_sql)
+    def insert_rows(
+        self,
+        full_table_name: str,
+        column_names: Sequence[str],
+        rows: Iterable[Tuple[Any, ...]],
+        is_temp_table: bool = False,
+        table_lock: bool = False,
+    ) -> int:
+        """Insert projected rows into an existing table.
+        Args:
+            full_table_name: the target table name.
+            column_names: the columns of the rows, in value order.
+            rows: positional row values.
+            is_temp_table: whether the table is a temp table.
+            table_lock: whether to load with TABLOCK instead of row locks.
+        Returns:
+            The number of rows inserted.
+        """
+        if self.config.get("load_method") == "bulk_insert":
+            return self.bulk_insert_rows(
+                full_table_name=full_table_name,
+                column_names=column_names,
+                rows=rows,
+                is_temp_table=is_temp_table,
+                table_lock=table_lock,
+            )
+        if self.config.get("load_method") == "bulk_copy":
+            bulk_copy_connection = self.get_bulk_copy_connection()
+            if bulk_copy_connection is not None:
+                return self.bulk_copy_rows(
+                    bulk_copy_connection,
+                    full_table_name=full_table_name,
+                    column_names=column_names,
+                    rows=rows,
+                    is_temp_table=is_temp_table,
+                    table_lock=table_lock,
+                )
+
+        rows_per_statement = self.rows_per_insert_statement(len(column_names))
+        count = 0
+        for chunk in iter_chunks(rows, rows_per_statement):
+            self.execute_multirow_insert(
+                full_table_name, column_names, chunk, table_lock=table_lock
+            )
+            count += len(chunk)
 
-        columns = self.column_representation(schema)
+        return count
 
-        # temporary fix to ensure missing properties are added
-        insert_records = []
-        for record in records:
-            insert_record = {}
-            for column in columns:
-                insert_record[column.name] = record.get(column.name)
-            insert_records.append(insert_record)
+    def get_row_projector(self, schema: dict) -> RowProjector:
+        """Return the row projector for a conformed schema.
+        The projector is compiled once per schema version.
+        Args:
+            schema: the conformed JSON schema of the table.
+        Returns:
+            A projector emitting rows in schema property order.
+        """
+        schema_cache = self.get_schema_cache(schema)
+        if "row_projector" not in schema_cache:
+            converters: Dict[str, Converter] = {
+                "json": json_converter(self.json_serializer),
+                "boolean": coerce_boolean,
+            }
+            schema_cache["row_projector"] = RowProjector(
+                schema["properties"],
+                {
+                    name: converters[conversion]
+                    for name, conversion in self.column_conversions(schema).items()
+                },
+            )
+        return schema_cache["row_projector"]
 
-        self.connection.execute(insert_sql, insert_records)
+    def get_columnar_projector(self, schema: dict) -> ColumnarProjector:
+        """Return the columnar projector for a conformed schema.
+        The projector reads the raw records of the stream's current schema.
+        Args:
+            schema: the conformed JSON schema of the table.
+        Returns:
+            A projector emitting rows in schema property order.
+        """
+        schema_cache = self.get_schema_cache(schema)
+        if "columnar_projector" not in schema_cache:
+            converters: Dict[str, ColumnConverter] = {
+                "json": json_column_converter(self.json_serializer),
+                "boolean": coerce_boolean_column,
+            }
+            schema_cache["columnar_projector"] = ColumnarProjector(
+                schema["properties"],
+                self.schema["properties"],
+                {
+                    name: converters[conversion]
+                    for name, conversion in self.column_conversions(schema).items()
+                },
+            )
+        return schema_cache["columnar_projector"]
 
-        if isinstance(records, list):
-            return len(records)  # If list, we can quickly return record count.
+    def column_conversions(self, schema: dict) -> Dict[str, str]:
+        """Return the columns whose values are converted before loading.
+        Objects, arrays and values of unknown type are serialized to JSON, and
+        booleans to the '1'/'0' of VARCHAR(1) columns.
+        Args:
+            schema: the conformed JSON schema of the table.
+        Returns:
+            Either "json" or "boolean" per column needing conversion.
+        """
+        conversions: Dict[str, str] = {}
+        for name, jsonschema in schema["properties"].items():
+            scalar_type = next(
+                (
+                    json_type
+                    for json_type in ("string", "integer", "number", "boolean")
+                    if self.connector._jsonschema_type_check(jsonschema, (json_type,))
+                ),
+                None,
+            )
+            if scalar_type is None or self.connector._jsonschema_type_check(
+                jsonschema, ("object", "array")
+            ):
+                conversions[name] = "json"
+            elif scalar_type == "boolean":
+                conversions[name] = "boolean"
+        return conversions
 
-        return None  # Unknown record count.
+    def rows_per_insert_statement(self, column_count: int) -> int:
+        """Return how many rows fit in a single INSERT ... VALUES statement.
+        Args:
+            column_count: The number of columns inserted per row.
+        Returns:
+            The row count, bounded by the parameter and row constructor limits.
+        """
+        return max(
+            1, min(MAX_VALUES_ROWS, MAX_STATEMENT_PARAMETERS // max(1, column_count))
+        )
+
+    def generate_multirow_insert_statement(
+        self,
+        full_table_name: str,
+        column_names: Sequence[str],
+        row_count: int,
+        table_lock: bool = False,
+    ) -> str:
+        """Generate a positional INSERT statement with `row_count` row constructors.
+        Statements are cached per (table, columns, row count, table lock) shape.
+        Args:
+            full_table_name: the target table name.
+            column_names: the columns to insert, in parameter order.
+            row_count: the number of rows in the VALUES clause.
+            table_lock: whether the statement takes a TABLOCK hint.
+        Returns:
+            An insert statement using the driver's positional parameter style.
+        """
+        cache_key = (full_table_name, tuple(column_names), row_count, table_lock)
+        statement = self._insert_statement_cache.get(cache_key)
+        if statement is None:
+            placeholder = "?" if self.connection.dialect.paramstyle == "qmark" else "%s"
+            row_template = f"({', '.join([placeholder] * len(column_names))})"
+            table_hint = " WITH (TABLOCK)" if table_lock else ""
+            statement = (
+                f"INSERT INTO {full_table_name}{table_hint} "
+                f"({', '.join(column_names)}) "
+                f"VALUES {', '.join([row_template] * row_count)}"
+            )
+            self._insert_statement_cache[cache_key] = statement
+            self.logger.debug(
+                "Generated %s row insert statement for %s", row_count, full_table_name
+            )
+        return statement
+
+    def execute_multirow_insert(
+        self,
+        full_table_name: str,
+        column_names: Sequence[str],
+        rows: Sequence[Tuple[Any, ...]],
+        table_lock: bool = False,
+    ) -> None:
+        """Insert a chunk of rows with a single multi-row INSERT statement.
+        Args:
+            full_table_name: the target table name.
+            column_names: the columns to insert.
+            rows: positional row values, in `column_names` order.
+            table_lock: whether to insert with a TABLOCK hint.
+        """
+        statement = self.generate_multirow_insert_statement(
+            full_table_name, column_names, len(rows), table_lock=table_lock
+        )
+        self.connection.exec_driver_sql(
+            statement, tuple(itertools.chain.from_iterable(rows))
+        )
+
+    def get_bulk_copy_connection(self) -> Optional[Any]:
+        """Return the raw driver connection if it supports TDS bulk copy.
+        Returns:
+            The DBAPI connection, or `None` if the driver cannot bulk copy.
+        """
+        dbapi_connection = self.connection.connection.connection
+        if hasattr(dbapi_connection, "bulk_copy"):
+            return dbapi_connection
+
+        if not self._bulk_copy_unavailable_logged:
+            self.logger.warning(
+                "The database driver does not support bulk copy, "
+                "falling back to load_method 'insert'."
+            )
+            self._bulk_copy_unavailable_logged = True
+        return None
+
+    def bulk_copy_rows(
+        self,
+        dbapi_connection: Any,
+        full_table_name: str,
+        column_names: Sequence[str],
+        rows: Iterable[Tuple[Any, ...]],
+        is_temp_table: bool = False,
+        table_lock: bool = False,
+    ) -> int:
+        """Load rows with the TDS bulk-load protocol (INSERT BULK).
+        Args:
+            dbapi_connection: A driver connection supporting `bulk_copy`.
+            full_table_name: the target table name.
+            column_names: the columns of the rows, in value order.
+            rows: positional row values.
+            is_temp_table: whether the table is a temp table.
+            table_lock: whether to bulk load with TABLOCK.
+        Returns:
+            The number of rows copied.
+        """
+        _, column_ids = self.get_column_ordinals(
+            full_table_name, column_names, is_temp_table
+        )
+
+        chunk_size = BULK_COPY_CHUNK_SIZE
+        bulk_copy_options: Dict[str, Any] = {}
+        if table_lock:
+            bulk_copy_options["tablock"] = True
+        if self.config.get("columnstore", False) and not is_temp_table:
+            # Each chunk is committed as one batch, which the server compresses
+            # into a rowgroup once it holds enough rows.
+            chunk_size = COLUMNSTORE_MIN_ROWGROUP_ROWS
+            bulk_copy_options["batch_size"] = chunk_size
+
+        count = 0
+        for chunk in iter_chunks(rows, chunk_size):
+            dbapi_connection.bulk_copy(
+                full_table_name, chunk, column_ids=column_ids, **bulk_copy_options
+            )
+            count += len(chunk)
+        if not self.connection.in_transaction():
+            dbapi_connection.commit()
+
+        self.logger.info("Bulk copied %s rows into %s", count, full_table_name)
+        return count
+
+    def get_column_ordinals(
+        self,
+        full_table_name: str,
+        column_names: Sequence[str],
+        is_temp_table: bool = False,
+    ) -> Tuple[int, List[int]]:
+        """Return where the columns of a batch are in a table.
+        Args:
+            full_table_name: the target table name.
+            column_names: the columns of the rows, in value order.
+            is_temp_table: whether the table is a temp table.
+        Returns:
+            The number of table columns, and the 1-based ordinal of each of
+            `column_names`.
+        """
+        # Temp tables are created with SELECT TOP 0 * INTO, so they share
+        # column ordinals with the table they were created from.
+        ordinal_table_name = full_table_name
+        if is_temp_table:
+            ordinal_table_name = self._staging_table_source or full_table_name.replace(
+                "#", ""
+            )
+        table_columns = [
+            name.casefold()
+            for name in self.connector.get_table_columns(ordinal_table_name)
+        ]
+        column_ids = [table_columns.index(name.casefold()) + 1 for name in column_names]
+        return len(table_columns), column_ids
+
+    def bulk_insert_rows(
+        self,
+        full_table_name: str,
+        column_names: Sequence[str],
+        rows: Iterable[Tuple[Any, ...]],
+        is_temp_table: bool = False,
+        table_lock: bool = False,
+    ) -> int:
+        """Load rows by writing them to a staging file and running BULK INSERT.
+        The file is written to `staging_file_directory`, which SQL Server must
+        be able to read as `staging_file_server_directory`, and removed after
+        the load. Rows are written in table column order, as BULK INSERT maps
+        fields to columns by position.
+        Args:
+            full_table_name: the target table name.
+            column_names: the columns of the rows, in value order.
+            rows: positional row values.
+            is_temp_table: whether the table is a temp table.
+            table_lock: whether to bulk load with TABLOCK.
+        Returns:
+            The number of rows loaded.
+        """
+        column_count, column_ids = self.get_column_ordinals(
+            full_table_name, column_names, is_temp_table
+        )
+        if column_ids != list(range(1, column_count + 1)):
+            rows = reorder_rows(rows, column_ids, column_count)
+
+        _, _, table_name = self.parse_full_table_name(full_table_name)
+        file_name = f"{table_name.lstrip('#')}-{uuid.uuid4().hex}.csv"
+        local_directory = self.config.get("staging_file_directory")
+        local_path = os.path.join(local_directory or tempfile.gettempdir(), file_name)
+        server_path = self.staging_file_server_path(file_name, local_path)
+        try:
+            with StagingFileWriter(
+                local_path,
+                chunk_size=self.config.get("staging_file_chunk_size")
+                or DEFAULT_CHUNK_SIZE,
+                use_mmap=self.config.get("staging_file_mmap", False),
+                datetime_timespec=(
+                    "milliseconds"
+                    if self.config.get("datetime_type", "datetime") == "datetime"
+                    else "microseconds"
+                ),
+            ) as writer:
+                count = writer.write_rows(rows)
+            if count:
+                self.execute_bulk_insert(
+                    full_table_name, server_path, is_temp_table, table_lock
+                )
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(local_path)
+
+        self.logger.info(
+            "Bulk inserted %s rows into %s from %s", count, full_table_name, server_path
+        )
+        return count
+
+    def staging_file_server_path(self, file_name: str, local_path: str) -> str:
+        """Return the path SQL Server reads a staging file from.
+        Args:
+            file_name: the name of the staging file.
+            local_path: the path the file is written to.
+        Returns:
+            The file in `staging_file_server_directory`, or `local_path` when
+            the server sees the directory at the same path.
+        """
+        server_directory = self.config.get("staging_file_server_directory")
+        if not server_directory:
+            return local_path
+        # The server may run on another OS than the target
+        separator = "\\" if "\\" in server_directory else "/"
+        return server_directory.rstrip("/\\") + separator + file_name
+
+    def execute_bulk_insert(
+        self,
+        full_table_name: str,
+        server_path: str,
+        is_temp_table: bool = False,
+        table_lock: bool = False,
+    ) -> None:
+        """Load a staging file into a table with BULK INSERT.
+        Args:
+            full_table_name: the target table name.
+            server_path: the staging file, as SQL Server sees it.
+            is_temp_table: whether the table is a temp table.
+            table_lock: whether to bulk load with TABLOCK.
+        """
+        options = [
+            "FORMAT = 'CSV'",
+            "FIELDQUOTE = '\"'",
+            "FIELDTERMINATOR = ','",
+            "ROWTERMINATOR = '0x0a'",
+            "CODEPAGE = '65001'",
+            "KEEPNULLS",
+        ]
+        if table_lock:
+            options.append("TABLOCK")
+        if self.config.get("columnstore", False) and not is_temp_table:
+            options.append(f"BATCHSIZE = {COLUMNSTORE_MIN_ROWGROUP_ROWS}")
+        quoted_path = server_path.replace("'", "''")
+        self.connection.exec_driver_sql(
+            f"BULK INSERT {full_table_name} FROM '{quoted_path}' "
+            f"WITH ({', '.join(options)})"
+        )
+        if not self.connection.in_transaction():
+            self.connection.connection.connection.commit()
 
     def column_representation(
         self,
         schema: dict,
     ) -> List[Column]:
         """Returns a sql alchemy table representation for the current schema."""
-        columns: list[Column] = []
-        conformed_properties = self.conform_schema(schema)["properties"]
-        for property_name, property_jsonschema in conformed_properties.items():
-            columns.append(
-                Column(
-                    property_name,
-                    self.connector.to_sql_type(property_jsonschema),
+        schema_cache = self.get_schema_cache(schema)
+        if "columns" not in schema_cache:
+            columns: list[Column] = []
+            conformed_properties = self.conform_schema(schema)["properties"]
+            for property_name, property_jsonschema in conformed_properties.items():
+                columns.append(
+                    Column(
+                        property_name,
+                        self.connector.to_sql_type(property_jsonschema),
+                    )
                 )
+            schema_cache["columns"] = columns
+        return schema_cache["columns"]
+
+    def schema_fingerprint(self, schema: dict) -> str:
+        """Return a fingerprint of the schema contents.
+        Fingerprints are remembered per schema object, so repeated lookups
+        for the same schema do not serialize it again.
+        Args:
+            schema: A JSON schema.
+        Returns:
+            A hex digest identifying the schema version.
+        """
+        cached = self._schema_fingerprints.get(id(schema))
+        if cached is not None and cached[0] is schema:
+            return cached[1]
+
+        fingerprint = hashlib.sha1(
+            json.dumps(schema, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        self._schema_fingerprints[id(schema)] = (schema, fingerprint)
+        return fingerprint
+
+    def get_schema_cache(self, schema: dict) -> Dict[str, Any]:
+        """Return the cache of values derived from a schema version.
+        All caches are dropped when the sink's own schema changes, i.e. when
+        a new SCHEMA message arrives for the stream.
+        Args:
+            schema: A JSON schema.
+        Returns:
+            A dict holding the values derived from `schema`.
+        """
+        active_fingerprint = self.schema_fingerprint(self.schema)
+        if active_fingerprint != self._active_schema_fingerprint:
+            self._conformed_names.clear()
+            self._conformed_record_keys.clear()
+            self._schema_caches.clear()
+            self._schema_fingerprints = {
+                id(self.schema): (self.schema, active_fingerprint)
+            }
+            self._insert_statement_cache.clear()
+            self._active_schema_fingerprint = active_fingerprint
+
+        return self._schema_caches.setdefault(self.schema_fingerprint(schema), {})
+
+    def conform_schema(self, schema: dict) -> dict:
+        """Return schema dictionary with property names conformed.
+        Args:
+            schema: JSON schema dictionary.
+        Returns:
+            A schema dictionary with the property names conformed.
+        """
+        schema_cache = self.get_schema_cache(schema)
+        if "conformed_schema" not in schema_cache:
+            schema_cache["conformed_schema"] = super().conform_schema(schema)
+        return schema_cache["conformed_schema"]
+
+    def conform_record(self, record: dict) -> dict:
+        """Return record dictionary with property names conformed.
+        The conformed names are checked for clashes once per distinct key set.
+        Args:
+            record: Dictionary representing a single record.
+        Returns:
+            New record dictionary with conformed column names.
+        """
+        keys = tuple(record)
+        conformed_keys = self._conformed_record_keys.get(keys)
+        if conformed_keys is None:
+            conformed_property_names = {key: self.conform_name(key) for key in keys}
+            self._check_conformed_names_not_duplicated(conformed_property_names)
+            conformed_keys = list(conformed_property_names.values())
+            if len(self._conformed_record_keys) >= MAX_CACHED_RECORD_KEY_SETS:
+                self._conformed_record_keys.clear()
+            self._conformed_record_keys[keys] = conformed_keys
+        return dict(zip(conformed_keys, record.values()))
+
+    def _parse_timestamps_in_record(
+        self, record: dict, schema: dict, treatment: DatetimeErrorTreatmentEnum
+    ) -> None:
+        """Parse the date and time strings of a record to native values.
+        Only the properties the schema marks as datelike are visited. Values
+        are parsed with cached ISO 8601 parsers, see `target_mssql.timestamps`,
+        so timestamps repeated across records are parsed once.
+        Args:
+            record: Individual record in the stream.
+            schema: The JSON schema of the stream.
+            treatment: How values that fail to parse are repaired.
+        """
+        schema_cache = self.get_schema_cache(schema)
+        datelike_properties = schema_cache.get("datelike_properties")
+        if datelike_properties is None:
+            parsers = get_datelike_parsers(
+                keep_offset=self.config.get("datetime_type") == "datetimeoffset"
             )
-        return columns
+            datelike_properties = [
+                (name, datelike_type, parsers[datelike_type])
+                for name, datelike_type in (
+                    (name, get_datelike_property_type(jsonschema))
+                    for name, jsonschema in schema["properties"].items()
+                )
+                if datelike_type in parsers
+            ]
+            schema_cache["datelike_properties"] = datelike_properties
+
+        for name, datelike_type, parse in datelike_properties:
+            value = record.get(name)
+            if not isinstance(value, str):
+                continue
+            try:
+                record[name] = parse(value)
+            except (ValueError, OverflowError) as ex:
+                record[name] = handle_invalid_timestamp_in_record(
+                    record, [name], value, datelike_type, ex, treatment, self.logger
+                )
 
     def process_batch(self, context: dict) -> None:
         """Process a batch with the given batch context.
-        Writes a batch to the SQL target. Developers may override this method
-        in order to provide a more efficient upload/upsert process.
+        With `max_parallelism` above 1, `pipelined` or the `asyncio` writer
+        backend, the batch is loaded in the background, one batch of a stream
+        at a time. Pipelined batches are projected here while the previous
+        batch loads.
+        Their records are counted as written once the load has finished, see
+        `count_loaded_batch`.
         Args:
             context: Stream partition or context dictionary.
         """
-        # First we need to be sure the main table is already created
-        conformed_records = (
-            [self.conform_record(record) for record in context["records"]]
-            if isinstance(context["records"], list)
-            else (self.conform_record(record) for record in context["records"])
+        if not self._target.drains_in_background:
+            duplicate_count = self.load_batch(context)
+            if duplicate_count:
+                self.tally_duplicate_merged(duplicate_count)
+            return
+
+        rows = list(self.project_batch(context)) if self.pipelined else None
+        # Keeps mark_drained from counting the records before they are loaded
+        record_count, self._batch_records_read = self._batch_records_read, 0
+        previous_drain, self._pending_drain = self._pending_drain, None
+        self._pending_drain = self._target.submit_drain(
+            self.load_batch,
+            context,
+            rows,
+            after=previous_drain,
+            on_done=functools.partial(self.count_loaded_batch, record_count),
         )
 
-        join_keys = [self.conform_name(key, "column") for key in self.key_properties]
+    def count_loaded_batch(self, record_count: int, duplicate_count: int) -> None:
+        """Count the records of a batch loaded in the background as written.
+        The target calls this on its own thread once the load has finished,
+        so the sink's counters are only updated from one thread.
+        Args:
+            record_count: The number of records read for the batch.
+            duplicate_count: The superseded duplicates dropped from the batch.
+        """
+        if duplicate_count:
+            self.tally_duplicate_merged(duplicate_count)
+        self.tally_record_written(record_count - duplicate_count)
+
+    def mark_drained(self) -> None:
+        """Reset the tracking of the batch just drained."""
+        super().mark_drained()
+        # The SDK leaves the batch's duplicates to be subtracted again later
+        self._batch_dupe_records_merged = 0
+
+    @property
+    def pipelined(self) -> bool:
+        """Whether batches are projected before being handed to the writer."""
+        return bool(self.config.get("pipelined", False))
+
+    def wait_for_pending_drain(self) -> None:
+        """Block until the previous batch of this stream has been loaded."""
+        pending_drain, self._pending_drain = self._pending_drain, None
+        if pending_drain is not None:
+            pending_drain.result()
+
+    def project_batch(
+        self, context: dict
+    ) -> Union[CountedRows, Iterator[Tuple[Any, ...]]]:
+        """Conform, deduplicate and project the records of a batch, lazily.
+        With `columnar_batches`, the batch is projected a column at a time
+        from the raw records instead, see `ColumnarProjector`.
+        Args:
+            context: Stream partition or context dictionary.
+        Returns:
+            The rows to load, in the column order of the row projector,
+            counted unless the records of the batch are an iterator.
+        """
         schema = self.conform_schema(self.schema)
+        if self.config.get("columnar_batches", False):
+            raw_records: Iterable[Dict[str, Any]] = context["records"]
+            if self.key_properties:
+                raw_records = self.deduplicate_records(
+                    raw_records, list(self.key_properties)
+                )
+            if not isinstance(raw_records, Sequence):
+                raw_records = list(raw_records)
+            return CountedRows(
+                self.get_columnar_projector(schema)(raw_records), len(raw_records)
+            )
 
+        records: Iterable[Dict[str, Any]] = (
+            self.conform_record(record) for record in context["records"]
+        )
         if self.key_properties:
-            self.logger.info(f"Preparing table {self.full_table_name}")
+            join_keys = [
+                self.conform_name(key, "column") for key in self.key_properties
+            ]
+            records = self.deduplicate_records(records, join_keys)
+        # Deduplicated or sorted records are already collected
+        counted_records = records if isinstance(records, Sized) else context["records"]
+        rows = map(self.get_row_projector(schema), records)
+        if not isinstance(counted_records, Sized):
+            return rows
+        return CountedRows(rows, len(counted_records))
+
+    def load_batch(
+        self, context: dict, rows: Optional[Iterable[Tuple[Any, ...]]] = None
+    ) -> int:
+        """Write a batch to the SQL target.
+        Args:
+            context: Stream partition or context dictionary.
+            rows: The rows of the batch if already projected, see `project_batch`.
+        Returns:
+            The number of superseded duplicate records dropped from the batch.
+        """
+        # Records are conformed and projected lazily, so only one insert chunk
+        # is held in memory next to the batch itself.
+        if rows is None:
+            rows = self.project_batch(context)
+
+        join_keys = [self.conform_name(key, "column") for key in self.key_properties]
+        schema = self.conform_schema(self.schema)
+        column_names = self.get_row_projector(schema).column_names
+        column_types = self.infer_column_types(context)
+        load_table_name = self.prepare_load_table(schema, join_keys, column_types)
+
+        # Shadow tables are created from the schema of the sink loading them
+        # first, so later sinks may need to add columns.
+        if (
+            self.key_properties
+            or column_types is not None
+            or load_table_name != self.full_table_name
+        ):
+            self.logger.info(f"Preparing table {load_table_name}")
             self.connector.prepare_table(
-                full_table_name=self.full_table_name,
+                full_table_name=load_table_name,
                 schema=schema,
                 primary_keys=join_keys,
                 as_temp_table=False,
-            )
-            # Create a temp table (Creates from the table above)
-            self.logger.info(f"Creating temp table {self.full_table_name}")
-            self.connector.create_temp_table_from_table(
-                from_table_name=self.full_table_name
+                column_types=column_types,
             )
 
-            db_name, schema_name, table_name = self.parse_full_table_name(
-                self.full_table_name
+        if self.key_properties:
+            tmp_table_name = self.prepare_staging_table(schema, load_table_name)
+
+            # Only the rows left after deduplication are staged
+            row_count = (
+                len(rows) if isinstance(rows, Sized) else len(context["records"])
             )
-            tmp_table_name = (
-                f"{schema_name}.#{table_name}" if schema_name else f"#{table_name}"
+            duplicate_count = len(context["records"]) - row_count
+            staging_plan = self.choose_staging_plan(row_count)
+            if self._staging_table_indexed:
+                # A reused staging table keeps the index of an earlier batch
+                if staging_plan == STAGING_HEAP:
+                    self.drop_staging_index()
+                elif staging_plan == STAGING_INDEX_AFTER_LOAD:
+                    staging_plan = STAGING_INDEX_BEFORE_LOAD
+            self.logger.info(
+                f"Staging {row_count} records into {tmp_table_name} "
+                f"using the '{staging_plan}' plan"
             )
+            if staging_plan == STAGING_INDEX_BEFORE_LOAD:
+                self.create_staging_index(join_keys)
             # Insert into temp table
-            self.bulk_insert_records(
-                full_table_name=tmp_table_name,
-                schema=schema,
-                records=conformed_records,
-                is_temp_table=True,
-            )
+            self.insert_rows(tmp_table_name, column_names, rows, is_temp_table=True)
+            if staging_plan == STAGING_INDEX_AFTER_LOAD:
+                self.create_staging_index(join_keys)
+            if staging_plan != STAGING_HEAP:
+                self.connector.update_table_statistics(tmp_table_name)
             # Merge data from Temp table to main table
-            self.logger.info(f"Merging data from temp table to {self.full_table_name}")
+            self.logger.info(f"Merging data from temp table to {load_table_name}")
             self.merge_upsert_from_table(
                 from_table_name=tmp_table_name,
-                to_table_name=self.full_table_name,
+                to_table_name=load_table_name,
                 schema=schema,
                 join_keys=join_keys,
             )
+            return duplicate_count
+
+        self.append_rows(load_table_name, column_names, rows, context)
+        return 0
+
+    def append_rows(
+        self,
+        full_table_name: str,
+        column_names: Sequence[str],
+        rows: Iterable[Tuple[Any, ...]],
+        context: dict,
+    ) -> None:
+        """Append a batch of rows to the table of a stream without keys.
+        With `append_mode` set to `minimal_logging` the rows are loaded with
+        TABLOCK. Bulk loads with TABLOCK can be logged minimally under the
+        SIMPLE and BULK_LOGGED recovery models, while INSERT statements are
+        fully logged and only take the table lock. Batches of at least
+        `rebuild_indexes_min_rows` records also disable the table's
+        nonclustered indexes during the load and rebuild them afterwards.
+        Shadow tables of `full_refresh` loads are always loaded with TABLOCK.
+        Args:
+            full_table_name: the table to append to.
+            column_names: the columns of the rows, in value order.
+            rows: positional row values.
+            context: Stream partition or context dictionary.
+        """
+        if not (
+            self.config.get("append_mode") == "minimal_logging"
+            or self.config.get("full_refresh", False)
+        ):
+            self.insert_rows(full_table_name, column_names, rows)
+            return
+
+        min_rows = self.config.get("rebuild_indexes_min_rows")
+        disabled_indexes: List[str] = []
+        if min_rows is not None and len(context["records"]) >= min_rows:
+            disabled_indexes = self.connector.get_nonclustered_indexes(full_table_name)
+            for index_name in disabled_indexes:
+                self.connector.disable_index(full_table_name, index_name)
+
+        try:
+            self.insert_rows(full_table_name, column_names, rows, table_lock=True)
+        finally:
+            for index_name in disabled_indexes:
+                self.connector.rebuild_index(full_table_name, index_name)
+        if disabled_indexes:
+            self.logger.info(
+                "Rebuilt %s nonclustered indexes of %s after loading %s records",
+                len(disabled_indexes),
+                full_table_name,
+                len(context["records"]),
+            )
+
+    @property
+    def shadow_table_name(self) -> str:
+        """Return the name of the table `full_refresh` loads go to.
+        Returns:
+            The shadow table name.
+        """
+        return f"{self.full_table_name}__shadow"
+
+    def infer_column_types(
+        self, context: dict
+    ) -> Optional[Dict[str, sqlalchemy.types.TypeEngine]]:
+        """Size the columns of the stream by the values of a batch.
+        Every batch is profiled, so a later batch with longer strings or
+        larger numbers widens the columns created for the first one. Columns
+        without values in the batch are left out, and keep their type. So are
+        key properties, as SQL Server cannot alter primary key columns.
+        Args:
+            context: Stream partition or context dictionary.
+        Returns:
+            The inferred type per conformed column name, or None unless
+            `infer_column_types` is enabled.
+        """
+        if not self.config.get("infer_column_types", False):
+            return None
+        properties = self.schema["properties"]
+        profiles = profile_records(
+            context["records"],
+            [name for name in properties if name not in self.key_properties],
+        )
+        return {
+            self.conform_name(name): self.connector.infer_sql_type(
+                properties[name], profile
+            )
+            for name, profile in profiles.items()
+            if profile.value_count
+        }
+
+    def prepare_load_table(
+        self,
+        schema: dict,
+        join_keys: List[str],
+        column_types: Optional[Dict[str, sqlalchemy.types.TypeEngine]] = None,
+    ) -> str:
+        """Return the table batches are loaded into.
+        With `full_refresh`, that is a shadow table. It is created empty for
+        the first batch of the run, and swapped in for the target table by
+        the stream's last sink at the end of the run, see `clean_up`.
+        Args:
+            schema: the conformed JSON schema of the table.
+            join_keys: The conformed key properties.
+            column_types: Column types overriding those of the schema.
+        Returns:
+            The table name.
+        """
+        if not self.config.get("full_refresh", False):
+            return self.full_table_name
+
+        shadow_table_name = self.shadow_table_name
+        # Sinks replaced after a schema change keep loading the same table
+        with self._target.shadow_tables_lock:
+            if shadow_table_name not in self._target.created_shadow_tables:
+                self.logger.info(f"Creating shadow table {shadow_table_name}")
+                self.connector.drop_table(shadow_table_name)
+                self.connector.create_empty_table(
+                    full_table_name=shadow_table_name,
+                    schema=schema,
+                    primary_keys=join_keys,
+                    column_types=column_types,
+                )
+                self._target.created_shadow_tables.add(shadow_table_name)
+        return shadow_table_name
+
+    @property
+    def staging_table_name(self) -> str:
+        """Return the name of the #temp table used to stage keyed batches.
+        Returns:
+            The staging table name.
+        """
+        _, schema_name, table_name = self.parse_full_table_name(self.full_table_name)
+        return f"{schema_name}.#{table_name}" if schema_name else f"#{table_name}"
 
+    def prepare_staging_table(
+        self, schema: dict, from_table_name: Optional[str] = None
+    ) -> str:
+        """Provide an empty staging table for a batch.
+        The staging table lives as long as the sink's connection. It is
+        created from the loaded table on first use and whenever the schema or
+        the columns of that table change, and truncated for every other batch.
+        Args:
+            schema: the conformed JSON schema of the table.
+            from_table_name: the table the batch is merged into, by default
+                the target table.
+        Returns:
+            The staging table name.
+        """
+        from_table_name = from_table_name or self.full_table_name
+        staging_table_key = (
+            self.schema_fingerprint(schema),
+            from_table_name,
+            self.connector.table_generation(from_table_name),
+        )
+        if self._staging_table_key == staging_table_key:
+            self.logger.info(f"Truncating temp table {self.staging_table_name}")
+            self.connection.execute(f"TRUNCATE TABLE {self.staging_table_name}")
         else:
-            self.bulk_insert_records(
-                full_table_name=self.full_table_name,
-                schema=schema,
-                records=conformed_records,
+            # Create a temp table (Creates from the target table)
+            self.logger.info(f"Creating temp table {self.staging_table_name}")
+            self.connector.create_temp_table_from_table(
+                from_table_name=from_table_name,
+                tmp_full_table_name=self.staging_table_name,
             )
+            self._staging_table_key = staging_table_key
+            self._staging_table_source = from_table_name
+            self._staging_table_indexed = False
+        return self.staging_table_name
+
+    def create_staging_index(self, join_keys: List[str]) -> None:
+        """Index the staging table on the join keys, unless already indexed.
+        Args:
+            join_keys: The conformed key properties.
+        """
+        if not self._staging_table_indexed:
+            self.connector.create_staging_index(self.staging_table_name, join_keys)
+            self._staging_table_indexed = True
+
+    def drop_staging_index(self) -> None:
+        """Drop the index of the staging table, to load a heap."""
+        self.connector.drop_staging_index(self.staging_table_name)
+        self._staging_table_indexed = False
+
+    def clean_up(self) -> None:
+        """Drop the staging table at the end of the stream.
+        With `full_refresh`, the stream's last sink swaps the shadow table in
+        for the target table. The SDK cleans up sinks replaced after a schema
+        change first, so by then every sink of the stream has been drained.
+        With `columnstore_reorganize`, the rowgroups left open by small
+        batches are compressed as well.
+        """
+        self.wait_for_pending_drain()
+        self.logger.info(
+            f"Table metadata cache for {self.full_table_name}: "
+            f"{self.connector.table_cache_hits} hits, "
+            f"{self.connector.table_cache_misses} misses"
+        )
+        if self._staging_table_key is not None:
+            self.connection.execute(f"DROP TABLE IF EXISTS {self.staging_table_name}")
+            self._staging_table_key = None
+            self._staging_table_source = None
+        shadow_table_name = self.shadow_table_name
+        if self._target.shadow_table_owners.get(shadow_table_name) is self:
+            # Streams without records leave the target table as it is
+            if shadow_table_name in self._target.created_shadow_tables:
+                self.logger.info(
+                    f"Swapping {shadow_table_name} in for {self.full_table_name}"
+                )
+                self.connector.swap_tables(
+                    self.full_table_name,
+                    shadow_table_name,
+                    keep_replaced_table=self.config.get("keep_replaced_tables", False),
+                )
+                self._target.created_shadow_tables.discard(shadow_table_name)
+            del self._target.shadow_table_owners[shadow_table_name]
+        if self.config.get("columnstore_reorganize", False):
+            index_name = self.connector.get_clustered_columnstore_index(
+                self.full_table_name
+            )
+            if index_name is not None:
+                self.logger.info(
+                    f"Compressing open rowgroups of {self.full_table_name}"
+                )
+                self.connector.reorganize_columnstore_index(
+                    self.full_table_name, index_name
+                )
+        super().clean_up()
+
+    def choose_staging_plan(self, record_count: int) -> str:
+        """Choose how the staging table is indexed for a batch.
+        Batches with at least `staging_index_min_rows` records get a clustered
+        index on the join keys and fresh statistics, so the merge can use a
+        merge join instead of scanning a heap. The index is built before the
+        load when records are staged in key order, and after it otherwise.
+        Args:
+            record_count: The number of records in the batch.
+        Returns:
+            One of the STAGING_* plan names.
+        """
+        min_rows = self.config.get("staging_index_min_rows")
+        if min_rows is None or record_count < min_rows:
+            return STAGING_HEAP
+        if self.config.get("sort_records_by_key", False):
+            return STAGING_INDEX_BEFORE_LOAD
+        return STAGING_INDEX_AFTER_LOAD
+
+    def deduplicate_records(
+        self, records: Iterable[Dict[str, Any]], join_keys: List[str]
+    ) -> Iterable[Dict[str, Any]]:
+        """Prepare a batch of keyed records for staging.
+        With `deduplicate_records`, only the last record for each key is kept.
+        With `sort_records_by_key`, records are ordered by key so the staged
+        rows follow the clustered primary key.
+        Args:
+            records: Conformed records.
+            join_keys: The conformed key properties.
+        Returns:
+            The records to stage.
+        """
+        deduplicate = self.config.get("deduplicate_records", False)
+        sort_by_key = self.config.get("sort_records_by_key", False)
+        if not (deduplicate or sort_by_key):
+            return records
+
+        def record_key(record: Dict[str, Any]) -> Tuple[Any, ...]:
+            return tuple(record.get(key) for key in join_keys)
+
+        if deduplicate:
+            latest_records: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+            record_count = 0
+            for record in records:
+                latest_records[record_key(record)] = record
+                record_count += 1
+            duplicate_count = record_count - len(latest_records)
+            if duplicate_count:
+                self.logger.info(
+                    "Dropped %s superseded duplicate records from batch",
+                    duplicate_count,
+                )
+            records = latest_records.values()
+
+        if sort_by_key:
+            # NULL keys sort last, and are never compared to other values
+            records = sorted(
+                records,
+                key=lambda record: tuple(
+                    (value is None, value) for value in record_key(record)
+                ),
+            )
+
+        return records
 
     def merge_upsert_from_table(
         self,
@@ -216,44 +1251,181 @@ class mssqlSink(SQLSink):
         join_keys: List[str],
     ) -> Optional[int]:
         """Merge upsert data from one table to another.
+        The statements used depend on the `upsert_strategy` setting.
         Args:
             from_table_name: The source table name.
             to_table_name: The destination table name.
             join_keys: The merge upsert keys, or `None` to append.
             schema: Singer Schema message.
         Return:
-            The number of records copied, if detectable, or `None` if the API does not
-            report number of records affected/inserted.
+            The number of records inserted or updated.
+        """
+        strategy = self.config.get("upsert_strategy") or "merge"
+        upsert_sql = self.generate_upsert_statement(
+            from_table_name=from_table_name,
+            to_table_name=to_table_name,
+            schema=schema,
+            join_keys=join_keys,
+            strategy=strategy,
+        )
+
+        start = time.perf_counter()
+        with self.connection.begin():
+            inserted, updated, staged = self.connection.execute(upsert_sql).fetchone()
+
+        self.logger.info(
+            "Upserted into %s with the '%s' strategy in %.3fs: "
+            "%s inserted, %s updated, %s unchanged",
+            to_table_name,
+            strategy,
+            time.perf_counter() - start,
+            inserted,
+            updated,
+            staged - inserted - updated,
+        )
+        return inserted + updated
+
+    def generate_upsert_statement(
+        self,
+        from_table_name: str,
+        to_table_name: str,
+        schema: dict,
+        join_keys: List[str],
+        strategy: str = "merge",
+    ) -> str:
+        """Generate the statement batch upserting one table into another.
+        The batch ends with a SELECT of the inserted, updated and staged row
+        counts. Statements are cached per schema version.
+        Args:
+            from_table_name: The source table name.
+            to_table_name: The destination table name.
+            schema: Singer Schema message.
+            join_keys: The merge upsert keys.
+            strategy: One of `merge`, `update_insert` or `delete_insert`.
+        Returns:
+            A T-SQL statement batch.
+        Raises:
+            ValueError: if the strategy is unknown.
         """
+        schema_cache = self.get_schema_cache(schema)
+        cache_key = (
+            "upsert_sql",
+            strategy,
+            from_table_name,
+            to_table_name,
+            tuple(join_keys),
+        )
+        if cache_key in schema_cache:
+            return schema_cache[cache_key]
+
         # TODO think about sql injeciton,
         # issue here https://github.com/MeltanoLabs/target-postgres/issues/22
 
+        property_names = list(schema["properties"].keys())
+        update_columns = [key for key in property_names if key not in join_keys]
+
         join_condition = " and ".join(
             [f"temp.{key} = target.{key}" for key in join_keys]
         )
-
         update_stmt = ", ".join(
-            [
-                f"target.{key} = temp.{key}"
-                for key in schema["properties"].keys()
-                if key not in join_keys
-            ]
-        )  # noqa
-
-        merge_sql = f"""
-            MERGE INTO {to_table_name} AS target
-            USING {from_table_name} AS temp
-            ON {join_condition}
-            WHEN MATCHED THEN
-                UPDATE SET
-                    { update_stmt }
-            WHEN NOT MATCHED THEN
-                INSERT ({", ".join(schema["properties"].keys())})
-                VALUES ({", ".join([f"temp.{key}" for key in schema["properties"].keys()])});
+            [f"target.{key} = temp.{key}" for key in update_columns]
+        )
+        changed_condition = ""
+        if self.config.get("merge_mode") == "skip_unchanged" and update_columns:
+            # EXCEPT compares NULLs as equal, unlike <>
+            changed_condition = f"""EXISTS (
+                SELECT {", ".join([f"temp.{key}" for key in update_columns])}
+                EXCEPT
+                SELECT {", ".join([f"target.{key}" for key in update_columns])}
+            )"""
+        counts_select = f"""
+            SELECT @inserted, @updated, (SELECT COUNT(*) FROM {from_table_name});
         """  # nosec
 
-        with self.connection.begin():
-            self.connection.execute(merge_sql)
+        if strategy == "merge":
+            matched_clause = ""
+            if update_columns:
+                matched_condition = (
+                    f" AND {changed_condition}" if changed_condition else ""
+                )
+                matched_clause = f"""WHEN MATCHED{matched_condition} THEN
+                    UPDATE SET
+                        { update_stmt }"""
+
+            upsert_sql = f"""
+                SET NOCOUNT ON;
+                DECLARE @merge_actions TABLE (merge_action NVARCHAR(10));
+                DECLARE @inserted INT, @updated INT;
+                MERGE INTO {to_table_name} AS target
+                USING {from_table_name} AS temp
+                ON {join_condition}
+                {matched_clause}
+                WHEN NOT MATCHED THEN
+                    INSERT ({", ".join(property_names)})
+                    VALUES ({", ".join([f"temp.{key}" for key in property_names])})
+                OUTPUT $action INTO @merge_actions;
+                SELECT
+                    @inserted = COUNT(CASE WHEN merge_action = 'INSERT' THEN 1 END),
+                    @updated = COUNT(CASE WHEN merge_action = 'UPDATE' THEN 1 END)
+                FROM @merge_actions;
+            """  # nosec
+
+        elif strategy == "update_insert":
+            update_sql = "SET @updated = 0;"
+            if update_columns:
+                update_filter = (
+                    f"WHERE {changed_condition}" if changed_condition else ""
+                )
+                update_sql = f"""
+                    UPDATE target
+                    SET { update_stmt }
+                    FROM {to_table_name} AS target WITH (UPDLOCK)
+                    INNER JOIN {from_table_name} AS temp
+                    ON {join_condition}
+                    {update_filter};
+                    SET @updated = @@ROWCOUNT;
+                """  # nosec
+
+            # UPDLOCK, HOLDLOCK keeps the key ranges checked by NOT EXISTS locked
+            # until the transaction commits.
+            upsert_sql = f"""
+                SET NOCOUNT ON;
+                DECLARE @inserted INT, @updated INT;
+                {update_sql}
+                INSERT INTO {to_table_name} ({", ".join(property_names)})
+                SELECT {", ".join([f"temp.{key}" for key in property_names])}
+                FROM {from_table_name} AS temp
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM {to_table_name} AS target WITH (UPDLOCK, HOLDLOCK)
+                    WHERE {join_condition}
+                );
+                SET @inserted = @@ROWCOUNT;
+            """  # nosec
+
+        elif strategy == "delete_insert":
+            # Matched rows are replaced, and reported as updated
+            upsert_sql = f"""
+                SET NOCOUNT ON;
+                DECLARE @inserted INT, @updated INT;
+                DELETE target
+                FROM {to_table_name} AS target WITH (UPDLOCK, HOLDLOCK)
+                WHERE EXISTS (
+                    SELECT 1 FROM {from_table_name} AS temp
+                    WHERE {join_condition}
+                );
+                SET @updated = @@ROWCOUNT;
+                INSERT INTO {to_table_name} ({", ".join(property_names)})
+                SELECT {", ".join(property_names)}
+                FROM {from_table_name};
+                SET @inserted = @@ROWCOUNT - @updated;
+            """  # nosec
+
+        else:
+            raise ValueError(f"Unknown upsert strategy '{strategy}'.")
+
+        upsert_sql += counts_select
+        schema_cache[cache_key] = upsert_sql
+        return upsert_sql
 
     def parse_full_table_name(
         self, full_table_name: str
@@ -301,9 +1473,14 @@ class mssqlSink(SQLSink):
         Returns:
             The name transformed to snake case.
         """
-        # strip non-alphanumeric characters, keeping - . _ and spaces
-        name = re.sub(r"[^a-zA-Z0-9_\-\.\s]", "", name)
-        # convert to snakecase
-        name = self.snakecase(name)
-        # replace leading digit
-        return replace_leading_digit(name)
+        cache_key = (name, object_type)
+        conformed_name = self._conformed_names.get(cache_key)
+        if conformed_name is None:
+            # strip non-alphanumeric characters, keeping - . _ and spaces
+            conformed_name = re.sub(r"[^a-zA-Z0-9_\-\.\s]", "", name)
+            # convert to snakecase
+            conformed_name = self.snakecase(conformed_name)
+            # replace leading digit
+            conformed_name = replace_leading_digit(conformed_name)
+            self._conformed_names[cache_key] = conformed_name
+        return conformed_name
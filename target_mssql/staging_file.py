@@ -0,0 +1,169 @@
+"""Streaming writer of CSV staging files for BULK INSERT."""
+
+from __future__ import annotations
+
+import datetime
+import decimal
+import mmap
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+# Bytes buffered before they are written out, and by which mapped files grow
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+FIELD_TERMINATOR = ","
+ROW_TERMINATOR = "\n"
+QUOTE = '"'
+# Values containing any of these are quoted, with quotes doubled
+_NEEDS_QUOTES = re.compile('[",\r\n]')
+
+
+def _format_string(value: str) -> str:
+    # An unquoted empty field is NULL, so empty strings are always quoted
+    if not value or _NEEDS_QUOTES.search(value):
+        return QUOTE + value.replace(QUOTE, QUOTE + QUOTE) + QUOTE
+    return value
+
+
+def _format_float(value: float) -> str:
+    text = repr(value)
+    if "e" in text:
+        # SQL Server converts scientific notation to FLOAT, but not to NUMERIC
+        return format(decimal.Decimal(text), "f")
+    return text
+
+
+class StagingFileWriter:
+    """Writes rows to a CSV file that SQL Server loads with BULK INSERT.
+
+    The file follows RFC 4180, which BULK INSERT reads with FORMAT = 'CSV':
+    fields are separated by commas, rows end with a line feed, and fields
+    containing a comma, quote or line break are quoted with quotes doubled.
+    NULL is an empty field, while empty strings are written as "". The file
+    is UTF-8 encoded, for CODEPAGE = '65001'.
+
+    Rows are formatted into a buffer that is written out every `chunk_size`
+    bytes or so. With `use_mmap`, the file is memory-mapped and grown by
+    `chunk_size` bytes at a time, so chunks are copied into the page cache
+    without a write call each.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_mmap: bool = False,
+        datetime_timespec: str = "microseconds",
+    ) -> None:
+        """Create the staging file.
+
+        Args:
+            path: The file to write. An existing file is overwritten.
+            chunk_size: The number of bytes buffered between writes.
+            use_mmap: Whether to write through a memory map of the file.
+            datetime_timespec: The `timespec` of `datetime.isoformat`, use
+                "milliseconds" for DATETIME columns.
+        """
+        self.path = path
+        self.chunk_size = max(1, chunk_size)
+        self.use_mmap = use_mmap
+        self.bytes_written = 0
+        self.rows_written = 0
+        self._file = open(path, "w+b")
+        self._mmap: Optional[mmap.mmap] = None
+        self._capacity = 0
+        self._buffer: List[str] = []
+        self._buffered_chars = 0
+        self._formatters: Dict[type, Callable[[Any], str]] = {
+            str: _format_string,
+            int: str,
+            bool: lambda value: "1" if value else "0",
+            float: _format_float,
+            decimal.Decimal: lambda value: format(value, "f"),
+            datetime.datetime: lambda value: value.isoformat(
+                sep=" ", timespec=datetime_timespec
+            ),
+            datetime.date: datetime.date.isoformat,
+            datetime.time: datetime.time.isoformat,
+        }
+
+    def format_value(self, value: Any) -> str:
+        """Return the CSV field of a value.
+
+        Args:
+            value: A row value. None becomes an empty field.
+
+        Returns:
+            The field text, quoted if needed.
+        """
+        if value is None:
+            return ""
+        formatter = self._formatters.get(type(value))
+        if formatter is None:
+            return _format_string(str(value))
+        return formatter(value)
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> int:
+        """Append rows to the file.
+
+        Args:
+            rows: Positional row values, in the column order of the table.
+
+        Returns:
+            The number of rows written.
+        """
+        format_value = self.format_value
+        count = 0
+        for row in rows:
+            line = FIELD_TERMINATOR.join(map(format_value, row)) + ROW_TERMINATOR
+            self._buffer.append(line)
+            self._buffered_chars += len(line)
+            count += 1
+            if self._buffered_chars >= self.chunk_size:
+                self._flush_buffer()
+        self.rows_written += count
+        return count
+
+    def _flush_buffer(self) -> None:
+        if not self._buffer:
+            return
+        data = "".join(self._buffer).encode("utf-8")
+        self._buffer = []
+        self._buffered_chars = 0
+        if not self.use_mmap:
+            self._file.write(data)
+        else:
+            start = self.bytes_written
+            end = start + len(data)
+            if end > self._capacity:
+                self._remap(max(end, self._capacity + self.chunk_size))
+            assert self._mmap is not None
+            self._mmap[start:end] = data
+        self.bytes_written += len(data)
+
+    def _remap(self, capacity: int) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.truncate(capacity)
+        self._mmap = mmap.mmap(self._file.fileno(), capacity)
+        self._capacity = capacity
+
+    def close(self) -> None:
+        """Write out buffered rows and close the file."""
+        if self._file.closed:
+            return
+        self._flush_buffer()
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+            # Drop the unused tail of the last chunk
+            self._file.truncate(self.bytes_written)
+        self._file.close()
+
+    def __enter__(self) -> "StagingFileWriter":
+        """Return the writer, closing it when the block ends."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the file."""
+        self.close()
@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import PurePath
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, cast
+
 from singer_sdk import typing as th
 from singer_sdk.target_base import SQLTarget
 
-from target_mssql.sinks import mssqlSink
+from target_mssql.async_writer import AsyncWriter
+from target_mssql.sinks import BULK_LOAD_METHODS, mssqlSink
+from target_mssql.staging_file import DEFAULT_CHUNK_SIZE
 
 
 class Targetmssql(SQLTarget):
@@ -44,6 +51,50 @@ class Targetmssql(SQLTarget):
             th.StringType,
             description="SQL Server database",
         ),
+        th.Property(
+            "pool_size",
+            th.IntegerType,
+            description="Connections kept open in each stream's connection pool",
+        ),
+        th.Property(
+            "max_overflow",
+            th.IntegerType,
+            description="Connections opened beyond `pool_size` when all are in use",
+        ),
+        th.Property(
+            "pool_pre_ping",
+            th.BooleanType,
+            description="Test pooled connections for liveness before using them",
+            default=False,
+        ),
+        th.Property(
+            "pool_recycle",
+            th.IntegerType,
+            description="Replace pooled connections older than this many seconds",
+        ),
+        th.Property(
+            "tds_version",
+            th.StringType,
+            description="TDS protocol version used by pymssql, for example `7.4`",
+        ),
+        th.Property(
+            "login_timeout",
+            th.IntegerType,
+            description="Seconds to wait for a connection and login",
+        ),
+        th.Property(
+            "query_timeout",
+            th.IntegerType,
+            description="Seconds to wait for a statement (0 waits indefinitely)",
+        ),
+        th.Property(
+            "autocommit",
+            th.BooleanType,
+            description=(
+                "Open pymssql connections in autocommit mode. Statements the "
+                "target groups in a transaction then commit one by one"
+            ),
+        ),
         th.Property(
             "default_target_schema",
             th.StringType,
@@ -58,10 +109,364 @@ class Targetmssql(SQLTarget):
             description="Use float data type for numbers (otherwise number type is used)",
             default=False,
         ),
+        th.Property(
+            "datetime_type",
+            th.StringType,
+            description=(
+                "Column type of date-time properties: `datetime`, `datetime2` for "
+                "microsecond precision, or `datetimeoffset` to keep UTC offsets"
+            ),
+            default="datetime",
+            allowed_values=["datetime", "datetime2", "datetimeoffset"],
+        ),
+        th.Property(
+            "infer_column_types",
+            th.BooleanType,
+            description=(
+                "Size the columns of new tables by the values loaded, profiling "
+                "every batch and widening columns when a batch needs more room. "
+                "Key properties keep the types of their schema"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "load_method",
+            th.StringType,
+            description=(
+                "How records are loaded: `insert` uses parameterized INSERT "
+                "statements, `bulk_copy` streams rows over the TDS bulk-load protocol "
+                "and falls back to `insert` when the driver does not support it, "
+                "`bulk_insert` writes each batch to a CSV file that SQL Server "
+                "loads with BULK INSERT"
+            ),
+            default="insert",
+            allowed_values=["insert", "bulk_copy", "bulk_insert"],
+        ),
+        th.Property(
+            "staging_file_directory",
+            th.StringType,
+            description=(
+                "Directory the staging files of `bulk_insert` loads are written "
+                "to, on a volume SQL Server can read (default: the temp directory)"
+            ),
+        ),
+        th.Property(
+            "staging_file_server_directory",
+            th.StringType,
+            description=(
+                "The staging file directory as the SQL Server host sees it, if "
+                "it is mounted at another path (default: staging_file_directory)"
+            ),
+        ),
+        th.Property(
+            "staging_file_chunk_size",
+            th.IntegerType,
+            description="Bytes buffered between writes to a staging file",
+            default=DEFAULT_CHUNK_SIZE,
+        ),
+        th.Property(
+            "staging_file_mmap",
+            th.BooleanType,
+            description="Write staging files through a memory map",
+            default=False,
+        ),
+        th.Property(
+            "merge_mode",
+            th.StringType,
+            description=(
+                "`update_all` updates every matched row when merging, "
+                "`skip_unchanged` only updates rows where a column value differs"
+            ),
+            default="update_all",
+            allowed_values=["update_all", "skip_unchanged"],
+        ),
+        th.Property(
+            "upsert_strategy",
+            th.StringType,
+            description=(
+                "How keyed streams are upserted from the staging table: `merge` "
+                "with a MERGE statement, `update_insert` with an UPDATE join "
+                "followed by INSERT ... WHERE NOT EXISTS, or `delete_insert` by "
+                "deleting matched rows and inserting all staged rows"
+            ),
+            default="merge",
+            allowed_values=["merge", "update_insert", "delete_insert"],
+        ),
+        th.Property(
+            "deduplicate_records",
+            th.BooleanType,
+            description=(
+                "Keep only the last record for each key within a batch before "
+                "staging it, instead of failing the merge on duplicate keys"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "sort_records_by_key",
+            th.BooleanType,
+            description="Stage keyed records ordered by their key properties",
+            default=False,
+        ),
+        th.Property(
+            "staging_index_min_rows",
+            th.IntegerType,
+            description=(
+                "Batches of keyed streams with at least this many records get a "
+                "clustered index on the key columns of the staging table, and "
+                "updated statistics, before merging"
+            ),
+        ),
+        th.Property(
+            "append_mode",
+            th.StringType,
+            description=(
+                "How streams without key properties are appended to: "
+                "`full_logging` with row locks, `minimal_logging` with TABLOCK. "
+                "With `load_method` `bulk_copy` or `bulk_insert`, TABLOCK loads "
+                "can be minimally logged under the SIMPLE and BULK_LOGGED "
+                "recovery models"
+            ),
+            default="full_logging",
+            allowed_values=["full_logging", "minimal_logging"],
+        ),
+        th.Property(
+            "rebuild_indexes_min_rows",
+            th.IntegerType,
+            description=(
+                "With `append_mode` `minimal_logging`, batches with at least this "
+                "many records disable the non-unique nonclustered indexes of the "
+                "table while loading and rebuild them afterwards"
+            ),
+        ),
+        th.Property(
+            "full_refresh",
+            th.BooleanType,
+            description=(
+                "Load each stream into an empty shadow table and swap it in for "
+                "the target table with sp_rename at the end of the run. State "
+                "is held until then"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "keep_replaced_tables",
+            th.BooleanType,
+            description=(
+                "With `full_refresh`, keep each replaced table as "
+                "`<table>__replaced` instead of dropping it"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "columnstore",
+            th.BooleanType,
+            description=(
+                "Create new tables as clustered columnstore indexes. With "
+                "`load_method` `bulk_copy` or `bulk_insert`, batch at least "
+                "102,400 records so bulk loads fill compressed rowgroups"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "columnstore_reorganize",
+            th.BooleanType,
+            description=(
+                "Reorganize the clustered columnstore index of each table at the "
+                "end of the run, compressing rowgroups still open"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "columnar_batches",
+            th.BooleanType,
+            description=(
+                "Project batches a column at a time, converting each column in "
+                "one pass, instead of conforming and projecting every record"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "pipelined",
+            th.BooleanType,
+            description=(
+                "Conform and project the next batch of a stream while the "
+                "previous one loads on a background writer"
+            ),
+            default=False,
+        ),
+        th.Property(
+            "writer_backend",
+            th.StringType,
+            description=(
+                "How batches drained in the background are run: `threads` on a "
+                "thread pool, `asyncio` as tasks of an event loop sharing "
+                "`max_parallelism` I/O threads across all streams"
+            ),
+            default="threads",
+            allowed_values=["threads", "asyncio"],
+        ),
+        th.Property(
+            "max_parallelism",
+            th.IntegerType,
+            description=(
+                "Maximum number of sinks drained at the same time. Above 1, full "
+                "sinks are drained on a thread pool while reading continues, each "
+                "stream on its own connection"
+            ),
+        ),
     ).to_dict()
 
     default_sink_class = mssqlSink
 
+    def __init__(
+        self,
+        config: dict | PurePath | str | list[PurePath | str] | None = None,
+        parse_env_config: bool = False,
+        validate_config: bool = True,
+    ) -> None:
+        """Initialize the target and its drain thread pool.
+        Args:
+            config: Target configuration.
+            parse_env_config: Whether to look for configuration values in
+                environment variables.
+            validate_config: True to require validation of config settings.
+        """
+        self._drain_executor: Optional[ThreadPoolExecutor] = None
+        self._async_writer: Optional[AsyncWriter] = None
+        # Submitted loads, with the callback to run once each has finished
+        self._pending_drains: List[Tuple[Future, Optional[Callable[[Any], None]]]] = []
+        self._pending_drains_lock = threading.Lock()
+        # Bounds the batches submitted but not yet loaded, across all streams
+        self._drain_slots: Optional[threading.BoundedSemaphore] = None
+        # The sink to swap in each shadow table of `full_refresh` loads, the
+        # stream's latest sink, and the shadow tables created by this run
+        self.shadow_table_owners: Dict[str, mssqlSink] = {}
+        self.created_shadow_tables: Set[str] = set()
+        self.shadow_tables_lock = threading.Lock()
+        super().__init__(
+            config=config,
+            parse_env_config=parse_env_config,
+            validate_config=validate_config,
+        )
+        if self.config.get("max_parallelism"):
+            self.max_parallelism = self.config["max_parallelism"]
+        if self.config.get("columnstore", False) and (
+            self.config.get("load_method") not in BULK_LOAD_METHODS
+        ):
+            self.logger.warning(
+                "With load_method 'insert', columnstore tables are loaded into "
+                "delta rowgroups. Use 'bulk_copy' or 'bulk_insert' to load "
+                "compressed rowgroups."
+            )
+        if self.config.get("append_mode") == "minimal_logging" and (
+            self.config.get("load_method") not in BULK_LOAD_METHODS
+        ):
+            self.logger.warning(
+                "With load_method 'insert', append_mode 'minimal_logging' only "
+                "takes table locks, as INSERT statements are fully logged. Use "
+                "'bulk_copy' or 'bulk_insert' for minimal logging."
+            )
+
+    @property
+    def drains_in_background(self) -> bool:
+        """Whether sinks hand their batches to the drain backend."""
+        return (
+            (self.config.get("max_parallelism") or 1) > 1
+            or bool(self.config.get("pipelined", False))
+            or self.config.get("writer_backend") == "asyncio"
+        )
+
+    def submit_drain(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        after: Optional[Future] = None,
+        on_done: Optional[Callable[[Any], None]] = None,
+    ) -> Future:
+        """Run a batch load on the drain backend.
+        Blocks while `max_parallelism` loads are already waiting or running, so
+        the projected batches held in memory stay bounded.
+        Args:
+            fn: The function loading the batch.
+            args: Arguments for `fn`.
+            after: The previous load of the same stream, which must finish
+                first. The thread pool waits for it here, the asyncio backend
+                chains the loads on its event loop.
+            on_done: Called with the result of `fn` by `wait_for_drains`, on
+                the thread waiting for the load rather than the one running it.
+        Returns:
+            The future of the load, which is also awaited before the next
+            STATE message is emitted.
+        """
+        with self._pending_drains_lock:
+            if self._drain_slots is None:
+                if self.config.get("writer_backend") == "asyncio":
+                    self._async_writer = AsyncWriter(self.max_parallelism)
+                else:
+                    self._drain_executor = ThreadPoolExecutor(
+                        max_workers=self.max_parallelism,
+                        thread_name_prefix="target-mssql-drain",
+                    )
+                self._drain_slots = threading.BoundedSemaphore(self.max_parallelism)
+            drain_slots = self._drain_slots
+            async_writer, drain_executor = self._async_writer, self._drain_executor
+
+        if async_writer is None and after is not None:
+            after.result()
+        drain_slots.acquire()
+        try:
+            if async_writer is not None:
+                future = async_writer.submit(fn, *args, after=after)
+            else:
+                future = cast(ThreadPoolExecutor, drain_executor).submit(fn, *args)
+        except BaseException:
+            drain_slots.release()
+            raise
+        future.add_done_callback(lambda _: drain_slots.release())
+        with self._pending_drains_lock:
+            self._pending_drains.append((future, on_done))
+        return future
+
+    def wait_for_drains(self) -> None:
+        """Block until every submitted batch load has finished.
+        The `on_done` callback of each load runs here, in submission order.
+        Raises:
+            Exception: the first error raised by a batch load.
+        """
+        with self._pending_drains_lock:
+            pending_drains, self._pending_drains = self._pending_drains, []
+        for future, on_done in pending_drains:
+            result = future.result()
+            if on_done is not None:
+                on_done(result)
+
+    def _write_state_message(self, state: dict) -> None:
+        """Emit the stream's latest state once all batches it covers are committed.
+        With `full_refresh`, batches are only committed to a shadow table that
+        the next run drops, so state is held until the end of the run, when
+        the shadow tables have been swapped in.
+        Args:
+            state: The state to emit.
+        """
+        self.wait_for_drains()
+        if self.shadow_table_owners:
+            self.logger.info("Holding state until the shadow tables are swapped in")
+            return
+        super()._write_state_message(state)
+
+    def _process_endofpipe(self) -> None:
+        """Drain all sinks and stop the drain backend."""
+        try:
+            super()._process_endofpipe()
+        finally:
+            if self._drain_executor is not None:
+                self._drain_executor.shutdown(wait=True)
+                self._drain_executor = None
+            if self._async_writer is not None:
+                self._async_writer.close()
+                self._async_writer = None
+            self._drain_slots = None
+
 
 if __name__ == "__main__":
     Targetmssql.cli()
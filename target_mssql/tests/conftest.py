@@ -0,0 +1,129 @@
+"""Shared fixtures for tests that do not need a running SQL Server."""
+# flake8: noqa
+import re
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import pytest
+
+from target_mssql.sinks import mssqlSink
+from target_mssql.staging_file import QUOTE, ROW_TERMINATOR
+from target_mssql.target import Targetmssql
+
+_UNQUOTED_FIELD = re.compile("[^,\n]*")
+
+
+class StubConnection:
+    """Records the statements a sink sends instead of executing them."""
+
+    def __init__(self, dbapi_connection=None, paramstyle="pyformat"):
+        self.executed = []
+        # Rows returned by successive `fetchone()` calls on execute results
+        self.results = []
+        self.transactions = 0
+        self.connection = SimpleNamespace(connection=dbapi_connection)
+        self.dialect = SimpleNamespace(paramstyle=paramstyle)
+        self.engine = SimpleNamespace(dialect=self.dialect)
+
+    def execute(self, statement, *multiparams, **params):
+        self.executed.append((str(statement), multiparams))
+        return SimpleNamespace(
+            fetchone=lambda: self.results.pop(0) if self.results else None,
+            fetchall=lambda: self.results.pop(0) if self.results else [],
+        )
+
+    def begin(self):
+        self.transactions += 1
+        return nullcontext()
+
+    def exec_driver_sql(self, statement, parameters=None):
+        self.executed.append((statement, parameters))
+
+    def in_transaction(self):
+        return False
+
+
+class StubBulkCopyConnection:
+    """A DBAPI connection exposing pymssql's `bulk_copy` interface."""
+
+    def __init__(self):
+        self.copies = []
+        self.commits = 0
+
+    def bulk_copy(self, table_name, elements, column_ids=None, **kwargs):
+        self.copies.append((table_name, list(elements), column_ids, kwargs))
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture()
+def stub_config():
+    return {
+        "username": "sa",
+        "password": "P@55w0rd",
+        "host": "localhost",
+        "port": "1433",
+        "database": "master",
+    }
+
+
+@pytest.fixture()
+def make_sink(stub_config):
+    """Build an `mssqlSink` wired to a `StubConnection`."""
+
+    def _make_sink(
+        schema, key_properties=None, config=None, dbapi_connection=None, columns=None
+    ):
+        target = Targetmssql(config={**stub_config, **(config or {})})
+        sink = mssqlSink(
+            target=target,
+            stream_name="stream",
+            schema=schema,
+            key_properties=key_properties or [],
+        )
+        sink.connector._connection = StubConnection(dbapi_connection)
+        table_columns = columns or list(schema["properties"])
+        sink.connector.get_table_columns = lambda full_table_name, column_names=None: {
+            name: None for name in table_columns
+        }
+        return sink
+
+    return _make_sink
+
+
+def read_staging_file(path):
+    """Read a staging file back, as BULK INSERT would split it.
+
+    Args:
+        path: A file written by `target_mssql.staging_file.StagingFileWriter`.
+
+    Returns:
+        The fields of each row, with None for NULL.
+    """
+    with open(path, encoding="utf-8", newline="") as file:
+        text = file.read()
+
+    row = []
+    position = 0
+    while position < len(text):
+        if text[position] == QUOTE:
+            start = end = position + 1
+            while True:
+                end = text.index(QUOTE, end)
+                if text.startswith(QUOTE + QUOTE, end):
+                    end += 2
+                    continue
+                break
+            field = text[start:end].replace(QUOTE + QUOTE, QUOTE)
+            position = end + 1
+        else:
+            match = _UNQUOTED_FIELD.match(text, position)
+            assert match is not None
+            field = match.group() or None
+            position = match.end()
+        row.append(field)
+        if text.startswith(ROW_TERMINATOR, position):
+            yield row
+            row = []
+        position += 1
@@ -0,0 +1,46 @@
+"""Tests for the asyncio writer backend."""
+# flake8: noqa
+import threading
+import time
+
+from target_mssql.async_writer import AsyncWriter
+
+
+def test_loads_share_a_bounded_number_of_threads():
+    writer = AsyncWriter(max_concurrency=2)
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def load(index):
+        with lock:
+            running.append(index)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.remove(index)
+        return threading.current_thread().name
+
+    futures = [writer.submit(load, index) for index in range(6)]
+    thread_names = {future.result(timeout=5) for future in futures}
+    writer.close()
+
+    assert max(peak) == 2
+    assert len(thread_names) <= 2
+
+
+def test_chained_loads_run_in_order():
+    writer = AsyncWriter(max_concurrency=4)
+    order = []
+
+    def load(index):
+        time.sleep(0.01 * (3 - index))
+        order.append(index)
+
+    future = None
+    for index in range(3):
+        future = writer.submit(load, index, after=future)
+    future.result(timeout=5)
+    writer.close()
+
+    assert order == [0, 1, 2]
@@ -0,0 +1,44 @@
+"""Tests for the columnar batch projector."""
+# flake8: noqa
+from target_mssql.columnar import (
+    ColumnarProjector,
+    coerce_boolean_column,
+    json_column_converter,
+)
+from target_mssql.projector import json_dumps_stdlib
+
+
+def test_projector_reads_raw_properties_in_column_order():
+    projector = ColumnarProjector(["b", "a_b"], ["b", "aB"])
+
+    rows = projector([{"aB": 1, "b": 2, "extra": 3}, {"b": 4}])
+
+    assert list(rows) == [(2, 1), (4, None)]
+
+
+def test_projector_converts_whole_columns():
+    projector = ColumnarProjector(
+        ["doc", "flag", "raw"],
+        ["doc", "flag", "raw"],
+        {
+            "doc": json_column_converter(json_dumps_stdlib),
+            "flag": coerce_boolean_column,
+        },
+    )
+
+    rows = projector(
+        [
+            {"doc": {"a": [1]}, "flag": True, "raw": [1]},
+            {"doc": "text", "flag": None, "raw": None},
+        ]
+    )
+
+    assert list(rows) == [('{"a": [1]}', "1", [1]), ("text", None, None)]
+
+
+def test_boolean_column_passes_other_values_through():
+    assert coerce_boolean_column([False, 1, None, "x"]) == ["0", 1, None, "x"]
+
+
+def test_projector_without_columns_emits_empty_rows():
+    assert list(ColumnarProjector([], [])([{"a": 1}, {}])) == [(), ()]
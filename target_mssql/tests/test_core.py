@@ -8,6 +8,7 @@ from urllib.parse import quote
 import pytest
 from singer_sdk.testing import sync_end_to_end
 
+from target_mssql.connector import mssqlConnector
 from target_mssql.target import Targetmssql
 from target_mssql.tests.samples.aapl.aapl import Fundamentals
 from target_mssql.tests.samples.sample_tap_countries.countries_tap import (
@@ -267,3 +268,32 @@ def test_insert_merge(mssql_target):
 
     file_name = "insert_merge_part2.singer"
     singer_file_to_target(file_name, mssql_target)
+
+
+@pytest.mark.parametrize("upsert_strategy", ["merge", "update_insert", "delete_insert"])
+def test_upsert_strategies(mssql_config, upsert_strategy):
+    config = {
+        **mssql_config,
+        "table_prefix": f"{upsert_strategy}_",
+        "upsert_strategy": upsert_strategy,
+    }
+    table_name = f"{upsert_strategy}_insert_merge_stream"
+    connection = mssqlConnector(config).connection
+    connection.execute(f"DROP TABLE IF EXISTS {table_name}")
+
+    for file_name in [
+        "insert_merge_part1.singer",
+        "insert_merge_part2.singer",
+        "upsert_strategies.singer",
+    ]:
+        singer_file_to_target(file_name, Targetmssql(config=config))
+
+    rows = connection.execute(
+        f"SELECT id, client_name FROM {table_name} ORDER BY id"
+    ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        ("1", "Gitter Windows App"),
+        ("2", "Gitter iOS App"),
+        ("3", "Generic ios app"),
+        ("4", "Gitter Android App"),
+    ]
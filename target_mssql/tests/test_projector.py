@@ -0,0 +1,55 @@
+"""Tests for the row projector."""
+# flake8: noqa
+import json
+
+import pytest
+
+from target_mssql import projector as projector_module
+from target_mssql.projector import (
+    RowProjector,
+    coerce_boolean,
+    get_json_serializer,
+    json_converter,
+    json_dumps_orjson,
+    json_dumps_stdlib,
+)
+
+serialize_json = json_converter(json_dumps_stdlib)
+
+
+def test_projector_emits_tuples_in_column_order():
+    projector = RowProjector(["b", "a", "c"])
+
+    assert projector({"a": 1, "b": 2, "extra": 3}) == (2, 1, None)
+
+
+def test_projector_converts_only_configured_columns():
+    projector = RowProjector(
+        ["doc", "flag", "raw"], {"doc": serialize_json, "flag": coerce_boolean}
+    )
+
+    assert projector({"doc": {"x": [1]}, "flag": True, "raw": {"y": 1}}) == (
+        '{"x": [1]}',
+        "1",
+        {"y": 1},
+    )
+    assert projector({"doc": None, "flag": False}) == (None, "0", None)
+
+
+def test_json_serializer_prefers_orjson(monkeypatch):
+    if projector_module.orjson is not None:
+        assert get_json_serializer() is json_dumps_orjson
+
+    monkeypatch.setattr(projector_module, "orjson", None)
+
+    assert get_json_serializer() is json_dumps_stdlib
+
+
+@pytest.mark.parametrize("serializer", ["json_dumps_stdlib", "json_dumps_orjson"])
+def test_json_serializers_write_valid_json(serializer):
+    if serializer == "json_dumps_orjson":
+        pytest.importorskip("orjson")
+    dumps = getattr(projector_module, serializer)
+    value = {"a": [1, 2.5, None, {"b": "ø"}], "big": 2**70, "1": True}
+
+    assert json.loads(dumps(value)) == value
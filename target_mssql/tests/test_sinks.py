@@ -0,0 +1,974 @@
+"""Tests for mssqlSink that run against a stub connection."""
+# flake8: noqa
+import datetime
+import threading
+import time
+
+import pytest
+from singer_sdk.exceptions import ConformedNameClashException
+from singer_sdk.helpers._typing import DatetimeErrorTreatmentEnum
+
+from target_mssql.connector import DDL_DIALECT
+from target_mssql.sinks import mssqlSink
+from target_mssql.target import Targetmssql
+from target_mssql.tests.conftest import (
+    StubBulkCopyConnection,
+    StubConnection,
+    read_staging_file,
+)
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "integer"},
+        "name": {"type": "string"},
+        "score": {"type": "number"},
+    },
+}
+
+
+def test_bulk_copy_streams_rows_in_table_column_order(make_sink):
+    dbapi_connection = StubBulkCopyConnection()
+    sink = make_sink(
+        SCHEMA,
+        config={"load_method": "bulk_copy"},
+        dbapi_connection=dbapi_connection,
+        columns=["score", "id", "dropped", "name"],
+    )
+
+    count = sink.bulk_insert_records(
+        full_table_name="dbo.stream",
+        schema=SCHEMA,
+        records=[{"id": 1, "name": "a", "score": 0.5}, {"id": 2}],
+    )
+
+    assert count == 2
+    assert dbapi_connection.copies == [
+        ("dbo.stream", [(1, "a", 0.5), (2, None, None)], [2, 4, 1], {})
+    ]
+    assert dbapi_connection.commits == 1
+    assert sink.connection.executed == []
+
+
+def test_bulk_copy_into_temp_table(make_sink):
+    dbapi_connection = StubBulkCopyConnection()
+    sink = make_sink(
+        SCHEMA, config={"load_method": "bulk_copy"}, dbapi_connection=dbapi_connection
+    )
+    requested_tables = []
+    get_table_columns = sink.connector.get_table_columns
+    sink.connector.get_table_columns = lambda name, column_names=None: (
+        requested_tables.append(name) or get_table_columns(name)
+    )
+
+    sink.bulk_insert_records(
+        full_table_name="dbo.#stream",
+        schema=SCHEMA,
+        records=[{"id": 1, "name": "a", "score": 0.5}],
+        is_temp_table=True,
+    )
+
+    assert requested_tables == ["dbo.stream"]
+    assert dbapi_connection.copies[0][0] == "dbo.#stream"
+
+
+def test_bulk_copy_falls_back_to_insert(make_sink):
+    sink = make_sink(
+        SCHEMA, config={"load_method": "bulk_copy"}, dbapi_connection=object()
+    )
+
+    sink.bulk_insert_records(
+        full_table_name="dbo.stream",
+        schema=SCHEMA,
+        records=[{"id": 1, "name": "a", "score": 0.5}],
+    )
+
+    assert sink.connection.executed == [
+        (
+            "INSERT INTO dbo.stream (id, name, score) VALUES (%s, %s, %s)",
+            (1, "a", 0.5),
+        )
+    ]
+
+
+def test_multirow_insert_chunks_by_parameter_limit(make_sink):
+    sink = make_sink(SCHEMA)
+    records = [{"id": i, "name": str(i), "score": i / 2} for i in range(1500)]
+
+    count = sink.bulk_insert_records(
+        full_table_name="dbo.stream", schema=SCHEMA, records=iter(records)
+    )
+
+    # 2100 parameters / 3 columns = 700 rows per statement
+    assert count == 1500
+    assert [len(params) // 3 for _, params in sink.connection.executed] == [
+        700,
+        700,
+        100,
+    ]
+    assert sink.connection.executed[1][1][:3] == (700, "700", 350.0)
+    assert sink.connection.executed[2][0].count("(%s, %s, %s)") == 100
+    assert sink.connection.executed[0][0] is sink.connection.executed[1][0]
+    assert set(sink._insert_statement_cache) == {
+        ("dbo.stream", ("id", "name", "score"), 700, False),
+        ("dbo.stream", ("id", "name", "score"), 100, False),
+    }
+
+
+def test_multirow_insert_caps_rows_per_statement(make_sink):
+    schema = {"properties": {"id": {"type": "integer"}}}
+    sink = make_sink(schema)
+
+    sink.bulk_insert_records(
+        full_table_name="stream",
+        schema=schema,
+        records=[{"id": i} for i in range(2001)],
+    )
+
+    assert [len(params) for _, params in sink.connection.executed] == [1000, 1000, 1]
+    assert sink.rows_per_insert_statement(1) == 1000
+    assert sink.rows_per_insert_statement(50) == 42
+    assert sink.rows_per_insert_statement(3000) == 1
+
+
+def test_multirow_insert_uses_qmark_placeholders(make_sink):
+    sink = make_sink(SCHEMA)
+    sink.connector._connection.dialect.paramstyle = "qmark"
+
+    statement = sink.generate_multirow_insert_statement("dbo.stream", ["id", "name"], 2)
+
+    assert statement == "INSERT INTO dbo.stream (id, name) VALUES (?, ?), (?, ?)"
+
+
+def test_multirow_insert_statements_are_cached_per_column_list(make_sink):
+    sink = make_sink(SCHEMA)
+
+    first = sink.generate_multirow_insert_statement("stream", ["id"], 1)
+    second = sink.generate_multirow_insert_statement("stream", ["id", "name"], 1)
+
+    assert first == "INSERT INTO stream (id) VALUES (%s)"
+    assert second == "INSERT INTO stream (id, name) VALUES (%s, %s)"
+    assert sink.generate_multirow_insert_statement("stream", ["id"], 1) is first
+
+
+def test_process_batch_streams_records_in_chunks(make_sink):
+    schema = {"properties": {"id": {"type": "integer"}}}
+    sink = make_sink(schema)
+    consumed = []
+    consumed_at_insert = []
+    exec_driver_sql = sink.connection.exec_driver_sql
+
+    def records():
+        for i in range(2500):
+            consumed.append(i)
+            yield {"id": i}
+
+    def record_progress(statement, parameters=None):
+        consumed_at_insert.append(len(consumed))
+        exec_driver_sql(statement, parameters)
+
+    sink.connection.exec_driver_sql = record_progress
+    sink.process_batch({"records": records()})
+
+    assert consumed_at_insert == [1000, 2000, 2500]
+
+
+def test_bulk_copy_sends_fixed_size_chunks(make_sink, monkeypatch):
+    monkeypatch.setattr("target_mssql.sinks.BULK_COPY_CHUNK_SIZE", 2)
+    dbapi_connection = StubBulkCopyConnection()
+    sink = make_sink(
+        SCHEMA, config={"load_method": "bulk_copy"}, dbapi_connection=dbapi_connection
+    )
+
+    count = sink.bulk_insert_records(
+        full_table_name="dbo.stream",
+        schema=SCHEMA,
+        records=({"id": i} for i in range(5)),
+    )
+
+    assert count == 5
+    assert [len(rows) for _, rows, _, _ in dbapi_connection.copies] == [2, 2, 1]
+    assert dbapi_connection.commits == 1
+
+
+def test_row_projector_is_compiled_from_schema(make_sink):
+    schema = {
+        "properties": {
+            "id": {"type": "integer"},
+            "active": {"type": ["boolean", "null"]},
+            "tags": {"type": "array"},
+            "meta": {"type": ["object", "null"]},
+            "untyped": {},
+        }
+    }
+    sink = make_sink(schema)
+
+    projector = sink.get_row_projector(schema)
+
+    assert projector is sink.get_row_projector(schema)
+    assert projector(
+        {"id": 1, "active": True, "tags": ["a"], "meta": {"k": 1}, "untyped": [2]}
+    ) == (1, "1", '["a"]', sink.json_serializer({"k": 1}), "[2]")
+
+
+def test_schema_derived_values_are_cached_per_schema_version(make_sink):
+    sink = make_sink(SCHEMA)
+    conformed = sink.conform_schema(sink.schema)
+    columns = sink.column_representation(conformed)
+    merge_sql = sink.generate_upsert_statement("#stream", "stream", conformed, ["id"])
+
+    assert sink.conform_schema(sink.schema) is conformed
+    assert sink.column_representation(conformed) is columns
+    assert sink.generate_upsert_statement("#stream", "stream", conformed, ["id"]) is (
+        merge_sql
+    )
+
+    sink.schema = {"properties": {**SCHEMA["properties"], "extra": {"type": "string"}}}
+
+    assert "extra" in sink.conform_schema(sink.schema)["properties"]
+    assert sink.column_representation(conformed) is not columns
+
+
+def test_conform_record_caches_names_and_detects_clashes(make_sink):
+    sink = make_sink(SCHEMA)
+
+    assert sink.conform_record({"camelCase": 1, "Other": 2}) == {
+        "camel_case": 1,
+        "other": 2,
+    }
+    assert sink._conformed_names[("camelCase", None)] == "camel_case"
+    with pytest.raises(ConformedNameClashException):
+        sink.conform_record({"a!b": 1, "ab": 2})
+
+
+def test_merge_reports_action_counts(make_sink):
+    sink = make_sink(SCHEMA, key_properties=["id"])
+    sink.connection.results.append((2, 3, 10))
+
+    count = sink.merge_upsert_from_table("#stream", "stream", SCHEMA, ["id"])
+
+    [(merge_sql, _)] = sink.connection.executed
+    assert count == 5
+    assert "WHEN MATCHED THEN" in merge_sql
+    assert "EXCEPT" not in merge_sql
+    assert "OUTPUT $action INTO @merge_actions;" in merge_sql
+
+
+def test_merge_skip_unchanged_compares_non_key_columns(make_sink):
+    sink = make_sink(
+        SCHEMA, key_properties=["id"], config={"merge_mode": "skip_unchanged"}
+    )
+    sink.connection.results.append((0, 1, 4))
+
+    assert sink.merge_upsert_from_table("#stream", "stream", SCHEMA, ["id"]) == 1
+
+    merge_sql = " ".join(sink.connection.executed[0][0].split())
+    assert (
+        "WHEN MATCHED AND EXISTS ( SELECT temp.name, temp.score EXCEPT "
+        "SELECT target.name, target.score ) THEN UPDATE SET "
+        "target.name = temp.name, target.score = temp.score"
+    ) in merge_sql
+
+
+def test_merge_without_non_key_columns_only_inserts(make_sink):
+    schema = {"properties": {"id": {"type": "integer"}}}
+    sink = make_sink(schema, key_properties=["id"])
+    sink.connection.results.append((1, 0, 1))
+
+    sink.merge_upsert_from_table("#stream", "stream", schema, ["id"])
+
+    assert "WHEN MATCHED" not in sink.connection.executed[0][0]
+
+
+def test_update_insert_strategy(make_sink):
+    sink = make_sink(
+        SCHEMA,
+        key_properties=["id"],
+        config={"upsert_strategy": "update_insert", "merge_mode": "skip_unchanged"},
+    )
+    sink.connection.results.append((1, 2, 3))
+
+    assert sink.merge_upsert_from_table("#stream", "stream", SCHEMA, ["id"]) == 3
+
+    upsert_sql = " ".join(sink.connection.executed[0][0].split())
+    assert "MERGE" not in upsert_sql
+    assert (
+        "UPDATE target SET target.name = temp.name, target.score = temp.score "
+        "FROM stream AS target WITH (UPDLOCK) INNER JOIN #stream AS temp "
+        "ON temp.id = target.id WHERE EXISTS ( SELECT temp.name, temp.score EXCEPT "
+        "SELECT target.name, target.score );"
+    ) in upsert_sql
+    assert (
+        "INSERT INTO stream (id, name, score) "
+        "SELECT temp.id, temp.name, temp.score FROM #stream AS temp "
+        "WHERE NOT EXISTS ( SELECT 1 FROM stream AS target WITH (UPDLOCK, HOLDLOCK) "
+        "WHERE temp.id = target.id );"
+    ) in upsert_sql
+
+
+def test_delete_insert_strategy(make_sink):
+    sink = make_sink(
+        SCHEMA, key_properties=["id"], config={"upsert_strategy": "delete_insert"}
+    )
+    sink.connection.results.append((1, 2, 3))
+
+    sink.merge_upsert_from_table("#stream", "stream", SCHEMA, ["id"])
+
+    upsert_sql = " ".join(sink.connection.executed[0][0].split())
+    assert (
+        "DELETE target FROM stream AS target WITH (UPDLOCK, HOLDLOCK) "
+        "WHERE EXISTS ( SELECT 1 FROM #stream AS temp WHERE temp.id = target.id );"
+    ) in upsert_sql
+    assert (
+        "INSERT INTO stream (id, name, score) SELECT id, name, score FROM #stream;"
+        in (upsert_sql)
+    )
+
+
+def test_unknown_upsert_strategy(make_sink):
+    sink = make_sink(SCHEMA, key_properties=["id"])
+
+    with pytest.raises(ValueError):
+        sink.generate_upsert_statement("#stream", "stream", SCHEMA, ["id"], "upsert")
+
+
+def test_deduplicate_records_keeps_last_version(make_sink):
+    sink = make_sink(
+        SCHEMA,
+        key_properties=["id"],
+        config={"deduplicate_records": True, "sort_records_by_key": True},
+    )
+    records = [
+        {"id": 3, "name": "c"},
+        {"id": None, "name": "null key"},
+        {"id": 1, "name": "a"},
+        {"id": 3, "name": "c2"},
+        {"id": 1, "name": "a2"},
+        {"id": 2, "name": "b"},
+    ]
+
+    staged = list(sink.deduplicate_records(iter(records), ["id"]))
+
+    assert staged == [
+        {"id": 1, "name": "a2"},
+        {"id": 2, "name": "b"},
+        {"id": 3, "name": "c2"},
+        {"id": None, "name": "null key"},
+    ]
+
+
+def test_deduplicate_records_is_opt_in(make_sink):
+    sink = make_sink(SCHEMA, key_properties=["id"])
+    records = iter([{"id": 1}, {"id": 1}])
+
+    assert sink.deduplicate_records(records, ["id"]) is records
+
+
+def _keyed_batch_statements(sink, record_count):
+    sink.connector.prepare_table = lambda **kwargs: None
+    sink.connection.results.append((record_count, 0, record_count))
+    sink.process_batch({"records": [{"id": i} for i in range(record_count)]})
+    return [" ".join(statement.split()) for statement, _ in sink.connection.executed]
+
+
+@pytest.mark.parametrize(
+    "config,record_count,expected",
+    [
+        ({}, 10, ["DROP", "SELECT", "INSERT", "SET"]),
+        ({"staging_index_min_rows": 20}, 10, ["DROP", "SELECT", "INSERT", "SET"]),
+        (
+            {"staging_index_min_rows": 10},
+            10,
+            ["DROP", "SELECT", "INSERT", "CREATE", "UPDATE", "SET"],
+        ),
+        (
+            {"staging_index_min_rows": 10, "sort_records_by_key": True},
+            10,
+            ["DROP", "SELECT", "CREATE", "INSERT", "UPDATE", "SET"],
+        ),
+    ],
+)
+def test_staging_plan(make_sink, config, record_count, expected):
+    sink = make_sink(SCHEMA, key_properties=["id"], config=config)
+
+    statements = _keyed_batch_statements(sink, record_count)
+
+    assert [statement.split()[0] for statement in statements] == expected
+    if "CREATE" in expected:
+        assert "CREATE CLUSTERED INDEX ix_staging_keys ON #stream (id)" in statements
+        assert "UPDATE STATISTICS #stream" in statements
+
+
+def test_staging_plan_counts_deduplicated_rows(make_sink):
+    sink = make_sink(
+        SCHEMA,
+        key_properties=["id"],
+        config={"staging_index_min_rows": 3, "deduplicate_records": True},
+    )
+    sink.connector.prepare_table = lambda **kwargs: None
+    sink.connection.results.append((2, 0, 2))
+
+    sink.process_batch({"records": [{"id": 1}, {"id": 2}, {"id": 1}]})
+
+    statements = [statement for statement, _ in sink.connection.executed]
+    assert not any(s.startswith(("CREATE", "UPDATE STATISTICS")) for s in statements)
+
+
+def test_staging_index_is_dropped_for_small_batches(make_sink):
+    sink = make_sink(
+        SCHEMA, key_properties=["id"], config={"staging_index_min_rows": 3}
+    )
+
+    _keyed_batch_statements(sink, 3)
+    sink.connection.executed.clear()
+    small_batch = _keyed_batch_statements(sink, 2)
+
+    assert [statement.split()[0] for statement in small_batch] == [
+        "TRUNCATE",
+        "DROP",
+        "INSERT",
+        "SET",
+    ]
+    assert small_batch[1] == "DROP INDEX ix_staging_keys ON #stream"
+    assert not sink._staging_table_indexed
+
+
+def test_staging_table_is_reused_across_batches(make_sink):
+    sink = make_sink(
+        SCHEMA, key_properties=["id"], config={"staging_index_min_rows": 1}
+    )
+
+    first_batch = _keyed_batch_statements(sink, 2)
+    sink.connection.executed.clear()
+    second_batch = _keyed_batch_statements(sink, 2)
+
+    assert [statement.split()[0] for statement in first_batch] == [
+        "DROP",
+        "SELECT",
+        "INSERT",
+        "CREATE",
+        "UPDATE",
+        "SET",
+    ]
+    assert [statement.split()[0] for statement in second_batch] == [
+        "TRUNCATE",
+        "INSERT",
+        "UPDATE",
+        "SET",
+    ]
+
+    sink.schema = {"properties": {**SCHEMA["properties"], "extra": {"type": "string"}}}
+    sink.connection.executed.clear()
+    third_batch = _keyed_batch_statements(sink, 2)
+
+    assert [statement.split()[0] for statement in third_batch][:2] == [
+        "DROP",
+        "SELECT",
+    ]
+
+    sink.connection.executed.clear()
+    sink.clean_up()
+
+    assert sink.connection.executed == [("DROP TABLE IF EXISTS #stream", ())]
+
+
+def test_staging_table_is_recreated_after_table_changes(make_sink):
+    sink = make_sink(SCHEMA, key_properties=["id"])
+
+    _keyed_batch_statements(sink, 2)
+    sink.connector.invalidate_table_cache(sink.full_table_name)
+    sink.connection.executed.clear()
+    statements = _keyed_batch_statements(sink, 2)
+
+    assert statements[:2] == [
+        "DROP TABLE IF EXISTS #stream",
+        "SELECT TOP 0 * into #stream FROM stream",
+    ]
+
+
+def _inferring_sink(make_sink, **kwargs):
+    sink = make_sink(SCHEMA, config={"infer_column_types": True}, **kwargs)
+    sink.prepared_tables = []
+    sink.connector.prepare_table = lambda **kwargs: sink.prepared_tables.append(
+        (
+            kwargs["full_table_name"],
+            {
+                name: str(column_type.compile(dialect=DDL_DIALECT))
+                for name, column_type in kwargs["column_types"].items()
+            },
+        )
+    )
+    return sink
+
+
+def test_inferred_column_types_follow_each_batch(make_sink):
+    sink = _inferring_sink(make_sink)
+
+    sink.process_batch({"records": [{"id": 1, "name": "ab", "score": 1.25}]})
+    sink.process_batch({"records": [{"id": 70_000, "name": "é" * 20}]})
+
+    assert sink.prepared_tables == [
+        ("stream", {"id": "SMALLINT", "name": "VARCHAR(16)", "score": "NUMERIC(9, 2)"}),
+        ("stream", {"id": "INTEGER", "name": "NVARCHAR(32)"}),
+    ]
+
+
+def test_key_properties_keep_their_schema_types(make_sink):
+    sink = _inferring_sink(make_sink, key_properties=["id"])
+
+    column_types = sink.infer_column_types(
+        {"records": [{"id": 1, "name": "ab", "score": 1.25}]}
+    )
+
+    assert sorted(column_types) == ["name", "score"]
+
+
+def test_inferring_sink_defers_creating_missing_table(make_sink):
+    sink = _inferring_sink(make_sink)
+    sink.connector.table_exists = lambda full_table_name: False
+
+    sink.setup()
+
+    assert sink.prepared_tables == []
+
+
+def test_batches_drain_on_thread_pool_before_state(make_sink, capsys):
+    sink = make_sink(SCHEMA, config={"max_parallelism": 4})
+    loads = []
+
+    def load_batch(context, rows=None):
+        time.sleep(0.05)
+        loads.append((threading.current_thread().name, context["records"]))
+        return 0
+
+    sink.load_batch = load_batch
+    sink.process_batch({"records": [{"id": 1}]})
+    sink.process_batch({"records": [{"id": 2}]})
+    sink._target._write_state_message({"bookmarks": {}})
+
+    assert sink._target.max_parallelism == 4
+    assert [records for _, records in loads] == [[{"id": 1}], [{"id": 2}]]
+    assert all(name.startswith("target-mssql-drain") for name, _ in loads)
+    assert capsys.readouterr().out == '{"bookmarks": {}}\n'
+
+
+def test_background_batches_are_counted_once_loaded(make_sink):
+    sink = make_sink(SCHEMA, key_properties=["id"], config={"max_parallelism": 2})
+    release = threading.Event()
+    counting_threads = []
+    tally_record_written = sink.tally_record_written
+
+    def load_batch(context, rows=None):
+        release.wait(timeout=5)
+        return 1
+
+    def tally_on_thread(count=1):
+        counting_threads.append(threading.current_thread())
+        tally_record_written(count)
+
+    sink.load_batch = load_batch
+    sink.tally_record_written = tally_on_thread
+    sink.tally_record_read(3)
+    sink.process_batch({"records": [{"id": 1}, {"id": 1}, {"id": 2}]})
+    sink.mark_drained()
+
+    assert sink._total_records_written == 0
+    release.set()
+    sink._target.wait_for_drains()
+
+    assert sink._total_records_written == 2
+    assert sink._total_dupe_records_merged == 1
+    assert counting_threads == [threading.current_thread()]
+
+
+def test_failed_background_drain_blocks_state(make_sink, capsys):
+    sink = make_sink(SCHEMA, config={"max_parallelism": 2})
+
+    def load_batch(context, rows=None):
+        raise RuntimeError("load failed")
+
+    sink.load_batch = load_batch
+    sink.process_batch({"records": [{"id": 1}]})
+
+    with pytest.raises(RuntimeError, match="load failed"):
+        sink._target._write_state_message({"bookmarks": {}})
+    assert capsys.readouterr().out == ""
+
+
+def test_batches_drain_inline_by_default(make_sink):
+    sink = make_sink(SCHEMA)
+    threads = []
+    sink.load_batch = lambda context: threads.append(threading.current_thread())
+
+    sink.process_batch({"records": [{"id": 1}]})
+
+    assert threads == [threading.current_thread()]
+    assert sink._target._drain_executor is None
+
+
+def test_pipelined_batches_are_projected_before_handoff(make_sink):
+    sink = make_sink(SCHEMA, key_properties=["id"], config={"pipelined": True})
+    sink.connector.prepare_table = lambda *args, **kwargs: None
+    sink.connection.results.append((1, 0, 1))
+    projected_on = []
+    project_batch = sink.project_batch
+
+    def tracking_project_batch(context):
+        projected_on.append(threading.current_thread())
+        return project_batch(context)
+
+    sink.project_batch = tracking_project_batch
+    sink.process_batch({"records": [{"id": 1, "name": "a", "score": 0.5}]})
+    sink.wait_for_pending_drain()
+
+    assert projected_on == [threading.current_thread()]
+    inserts = [
+        params
+        for statement, params in sink.connection.executed
+        if statement.startswith("INSERT INTO #stream")
+    ]
+    assert inserts == [(1, "a", 0.5)]
+
+
+def test_asyncio_backend_chains_batches_without_blocking(make_sink, capsys):
+    sink = make_sink(SCHEMA, config={"writer_backend": "asyncio"})
+    release = threading.Event()
+    loads = []
+
+    def load_batch(context, rows=None):
+        release.wait(timeout=5)
+        loads.append((threading.current_thread().name, context["records"]))
+        return 0
+
+    sink.load_batch = load_batch
+    sink.process_batch({"records": [{"id": 1}]})
+    sink.process_batch({"records": [{"id": 2}]})
+    assert loads == []
+
+    release.set()
+    sink._target._write_state_message({"bookmarks": {}})
+
+    assert [records for _, records in loads] == [[{"id": 1}], [{"id": 2}]]
+    assert all(name.startswith("target-mssql-async-io") for name, _ in loads)
+    assert capsys.readouterr().out == '{"bookmarks": {}}\n'
+    sink._target._async_writer.close()
+
+
+def test_asyncio_backend_fails_batches_after_a_failed_one(make_sink):
+    sink = make_sink(SCHEMA, config={"writer_backend": "asyncio"})
+    loads = []
+
+    def load_batch(context, rows=None):
+        if context["records"] == [{"id": 1}]:
+            raise RuntimeError("load failed")
+        loads.append(context["records"])
+
+    sink.load_batch = load_batch
+    sink.process_batch({"records": [{"id": 1}]})
+    sink.process_batch({"records": [{"id": 2}]})
+
+    with pytest.raises(RuntimeError, match="load failed"):
+        sink.wait_for_pending_drain()
+    assert loads == []
+    sink._target._async_writer.close()
+
+
+def test_minimal_logging_bulk_copies_with_tablock(make_sink):
+    dbapi_connection = StubBulkCopyConnection()
+    sink = make_sink(
+        SCHEMA,
+        config={"load_method": "bulk_copy", "append_mode": "minimal_logging"},
+        dbapi_connection=dbapi_connection,
+    )
+
+    sink.process_batch({"records": [{"id": 1, "name": "a", "score": 0.5}]})
+
+    assert dbapi_connection.copies == [
+        ("stream", [(1, "a", 0.5)], [1, 2, 3], {"tablock": True})
+    ]
+
+
+def test_minimal_logging_inserts_with_tablock(make_sink):
+    sink = make_sink(SCHEMA, config={"append_mode": "minimal_logging"})
+
+    sink.process_batch({"records": [{"id": 1, "name": "a", "score": 0.5}]})
+
+    assert sink.connection.executed == [
+        (
+            "INSERT INTO stream WITH (TABLOCK) (id, name, score) VALUES (%s, %s, %s)",
+            (1, "a", 0.5),
+        )
+    ]
+
+
+@pytest.mark.parametrize(
+    "record_count,expected_rebuilds",
+    [(2, []), (3, ["ALTER INDEX ix_name ON stream REBUILD"])],
+)
+def test_minimal_logging_rebuilds_indexes_of_large_batches(
+    make_sink, record_count, expected_rebuilds
+):
+    sink = make_sink(
+        SCHEMA,
+        config={"append_mode": "minimal_logging", "rebuild_indexes_min_rows": 3},
+    )
+    sink.connection.results.append([("ix_name",)])
+
+    sink.process_batch({"records": [{"id": i} for i in range(record_count)]})
+
+    statements = [statement for statement, _ in sink.connection.executed]
+    insert_index = next(
+        i for i, statement in enumerate(statements) if statement.startswith("INSERT")
+    )
+    assert [s for s in statements if s.startswith("ALTER INDEX")] == [
+        *(["ALTER INDEX ix_name ON stream DISABLE"] if expected_rebuilds else []),
+        *expected_rebuilds,
+    ]
+    assert statements[insert_index + 1 :] == expected_rebuilds
+
+
+def test_columnstore_batches_fill_compressed_rowgroups(make_sink, monkeypatch):
+    monkeypatch.setattr("target_mssql.sinks.COLUMNSTORE_MIN_ROWGROUP_ROWS", 3)
+    dbapi_connection = StubBulkCopyConnection()
+    sink = make_sink(
+        SCHEMA,
+        config={"load_method": "bulk_copy", "columnstore": True},
+        dbapi_connection=dbapi_connection,
+    )
+
+    sink.process_batch({"records": [{"id": i} for i in range(4)]})
+
+    assert [
+        (len(rows), options) for _, rows, _, options in dbapi_connection.copies
+    ] == [(3, {"batch_size": 3}), (1, {"batch_size": 3})]
+
+
+def test_columnstore_raises_batch_size_of_bulk_loads(make_sink):
+    assert make_sink(SCHEMA).max_size == 10000
+    assert make_sink(SCHEMA, config={"columnstore": True}).max_size == 10000
+    bulk_copy_config = {"columnstore": True, "load_method": "bulk_copy"}
+    assert make_sink(SCHEMA, config=bulk_copy_config).max_size == 102400
+
+
+def test_columnstore_reorganize_on_clean_up(make_sink):
+    sink = make_sink(SCHEMA, config={"columnstore_reorganize": True})
+    sink.connection.results.append(("cci_stream",))
+
+    sink.clean_up()
+
+    assert sink.connection.executed[-1][0] == (
+        "ALTER INDEX cci_stream ON stream "
+        "REORGANIZE WITH (COMPRESS_ALL_ROW_GROUPS = ON)"
+    )
+
+
+def _full_refresh_sink(make_sink, **kwargs):
+    sink = make_sink(SCHEMA, **kwargs)
+    sink.created_tables = []
+    sink.connector.create_empty_table = lambda full_table_name, **kwargs: (
+        sink.created_tables.append(full_table_name)
+    )
+    sink.connector.prepare_table = lambda *args, **kwargs: None
+    sink.setup()
+    return sink
+
+
+def test_full_refresh_loads_shadow_table_and_swaps_it_in(make_sink):
+    sink = _full_refresh_sink(
+        make_sink, config={"full_refresh": True, "keep_replaced_tables": True}
+    )
+
+    sink.process_batch({"records": [{"id": 1}]})
+    sink.process_batch({"records": [{"id": 2}]})
+    sink.clean_up()
+
+    statements = [statement for statement, _ in sink.connection.executed]
+    assert sink.created_tables == ["stream__shadow"]
+    assert statements == [
+        "DROP TABLE IF EXISTS stream__shadow",
+        "INSERT INTO stream__shadow WITH (TABLOCK) (id, name, score) "
+        "VALUES (%s, %s, %s)",
+        "INSERT INTO stream__shadow WITH (TABLOCK) (id, name, score) "
+        "VALUES (%s, %s, %s)",
+        "DROP TABLE IF EXISTS stream__replaced",
+        "IF OBJECT_ID('stream', 'U') IS NOT NULL "
+        "EXEC sp_rename 'stream', 'stream__replaced'",
+        "EXEC sp_rename 'stream__shadow', 'stream'",
+    ]
+    assert sink._target.shadow_table_owners == {}
+
+
+def test_full_refresh_merges_keyed_batches_into_shadow_table(make_sink):
+    sink = _full_refresh_sink(
+        make_sink, key_properties=["id"], config={"full_refresh": True}
+    )
+    sink.connection.results.append((1, 0, 1))
+
+    sink.process_batch({"records": [{"id": 1}]})
+    sink.clean_up()
+
+    statements = [statement for statement, _ in sink.connection.executed]
+    assert any("MERGE INTO stream__shadow AS target" in s for s in statements)
+    assert statements[-1] == "DROP TABLE IF EXISTS stream__replaced"
+
+
+def test_full_refresh_swaps_once_after_schema_change(stub_config, capsys):
+    target = Targetmssql(config={**stub_config, "full_refresh": True})
+    connection = StubConnection()
+    created_tables = []
+
+    class StubSink(mssqlSink):
+        def setup(self):
+            self.connector._connection = connection
+            self.connector.create_empty_table = lambda full_table_name, **kwargs: (
+                created_tables.append(full_table_name)
+            )
+            self.connector.prepare_table = lambda *args, **kwargs: None
+            super().setup()
+
+    target.default_sink_class = StubSink
+    target._process_schema_message(
+        {"stream": "stream", "schema": SCHEMA, "key_properties": []}
+    )
+    target._process_record_message({"stream": "stream", "record": {"id": 1}})
+    target._process_state_message({"value": {"bookmarks": {"stream": 1}}})
+    target.drain_all()
+    wider_schema = {
+        "type": "object",
+        "properties": {**SCHEMA["properties"], "tag": {"type": "string"}},
+    }
+    target._process_schema_message(
+        {"stream": "stream", "schema": wider_schema, "key_properties": []}
+    )
+    target._process_record_message({"stream": "stream", "record": {"id": 2}})
+    target._process_state_message({"value": {"bookmarks": {"stream": 2}}})
+    assert capsys.readouterr().out == ""
+
+    # The replaced sink is drained and cleaned up before the active one
+    target._process_endofpipe()
+
+    statements = [statement for statement, _ in connection.executed]
+    assert created_tables == ["stream__shadow"]
+    assert statements == [
+        "DROP TABLE IF EXISTS stream__shadow",
+        "INSERT INTO stream__shadow WITH (TABLOCK) (id, name, score) "
+        "VALUES (%s, %s, %s)",
+        "INSERT INTO stream__shadow WITH (TABLOCK) (id, name, score, tag) "
+        "VALUES (%s, %s, %s, %s)",
+        "DROP TABLE IF EXISTS stream__replaced",
+        "IF OBJECT_ID('stream', 'U') IS NOT NULL "
+        "EXEC sp_rename 'stream', 'stream__replaced'",
+        "EXEC sp_rename 'stream__shadow', 'stream'",
+        "DROP TABLE IF EXISTS stream__replaced",
+    ]
+    assert capsys.readouterr().out == '{"bookmarks": {"stream": 2}}\n'
+    assert target.shadow_table_owners == {}
+
+
+@pytest.mark.parametrize("key_properties", [[], ["id"]])
+def test_columnar_batches_project_like_records(make_sink, key_properties):
+    schema = {
+        "properties": {
+            "id": {"type": "integer"},
+            "userName": {"type": "string"},
+            "active": {"type": "boolean"},
+            "tags": {"type": "array"},
+        }
+    }
+    records = [
+        {"id": 2, "userName": "b", "active": True, "tags": ["x"]},
+        {"id": 1, "userName": "a"},
+        {"id": 2, "userName": "c", "active": False, "tags": []},
+    ]
+    config = {"deduplicate_records": True, "sort_records_by_key": True}
+    row_sink = make_sink(schema, key_properties=key_properties, config=config)
+    columnar_sink = make_sink(
+        schema,
+        key_properties=key_properties,
+        config={**config, "columnar_batches": True},
+    )
+
+    rows = list(row_sink.project_batch({"records": records}))
+    columnar_rows = list(columnar_sink.project_batch({"records": records}))
+
+    assert columnar_rows == rows
+    assert len(rows) == (2 if key_properties else 3)
+
+
+def test_datelike_properties_are_parsed_to_native_values(make_sink):
+    schema = {
+        "properties": {
+            "id": {"type": "integer"},
+            "updated_at": {"type": ["string", "null"], "format": "date-time"},
+            "day": {"type": "string", "format": "date"},
+            "at": {"type": "string", "format": "time"},
+        }
+    }
+    sink = make_sink(schema)
+    record = {
+        "id": "2023-01-01",
+        "updated_at": "2023-01-01T01:00:00+01:00",
+        "day": "2023-01-02",
+    }
+
+    sink._parse_timestamps_in_record(record, sink.schema, None)
+
+    assert record == {
+        "id": "2023-01-01",
+        "updated_at": datetime.datetime(2023, 1, 1),
+        "day": datetime.date(2023, 1, 2),
+    }
+
+
+def test_invalid_timestamps_follow_the_error_treatment(make_sink):
+    schema = {"properties": {"at": {"type": "string", "format": "date-time"}}}
+    sink = make_sink(schema)
+    record = {"at": "not a timestamp"}
+
+    sink._parse_timestamps_in_record(
+        record, sink.schema, DatetimeErrorTreatmentEnum.NULL
+    )
+    assert record == {"at": None}
+
+    with pytest.raises(ValueError):
+        sink._parse_timestamps_in_record(
+            {"at": "not a timestamp"}, sink.schema, DatetimeErrorTreatmentEnum.ERROR
+        )
+
+
+def test_bulk_insert_loads_a_staging_file_in_table_column_order(make_sink, tmp_path):
+    dbapi_connection = StubBulkCopyConnection()
+    sink = make_sink(
+        SCHEMA,
+        config={
+            "load_method": "bulk_insert",
+            "staging_file_directory": str(tmp_path),
+            "staging_file_server_directory": "\\\\fileserver\\staging\\",
+        },
+        dbapi_connection=dbapi_connection,
+        columns=["score", "id", "dropped", "name"],
+    )
+    staged_rows = []
+
+    def exec_driver_sql(statement, parameters=None):
+        (staging_file,) = tmp_path.iterdir()
+        staged_rows.extend(read_staging_file(str(staging_file)))
+        sink.connection.executed.append((statement, parameters))
+
+    sink.connection.exec_driver_sql = exec_driver_sql
+
+    count = sink.bulk_insert_records(
+        full_table_name="dbo.stream",
+        schema=SCHEMA,
+        records=[{"id": 1, "name": "a", "score": 0.5}, {"id": 2}],
+    )
+
+    assert count == 2
+    assert staged_rows == [["0.5", "1", None, "a"], [None, "2", None, None]]
+    ((statement, _),) = sink.connection.executed
+    assert statement.startswith(
+        "BULK INSERT dbo.stream FROM '\\\\fileserver\\staging\\stream-"
+    )
+    assert "FORMAT = 'CSV'" in statement and "KEEPNULLS" in statement
+    assert dbapi_connection.commits == 1
+    assert list(tmp_path.iterdir()) == []
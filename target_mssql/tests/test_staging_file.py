@@ -0,0 +1,82 @@
+"""Round-trip tests for the BULK INSERT staging file writer."""
+# flake8: noqa
+import datetime
+import decimal
+
+import pytest
+
+from target_mssql.staging_file import StagingFileWriter
+from target_mssql.tests.conftest import read_staging_file
+
+ROWS = [
+    (1, "plain", None, True),
+    (2, "", "comma, here", False),
+    (3, 'a "quoted" word', "line\nbreak\r\n", None),
+    (4, "ünïcødé ✓", '"', 1.5e-05),
+    (
+        decimal.Decimal("1E+2"),
+        datetime.datetime(2023, 1, 2, 3, 4, 5, 678901),
+        datetime.date(2023, 1, 2),
+        datetime.time(3, 4, 5),
+    ),
+]
+EXPECTED = [
+    ["1", "plain", None, "1"],
+    ["2", "", "comma, here", "0"],
+    ["3", 'a "quoted" word', "line\nbreak\r\n", None],
+    ["4", "ünïcødé ✓", '"', "0.000015"],
+    ["100", "2023-01-02 03:04:05.678901", "2023-01-02", "03:04:05"],
+]
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_rows_round_trip(tmp_path, use_mmap, chunk_size):
+    path = str(tmp_path / "batch.csv")
+
+    with StagingFileWriter(path, chunk_size=chunk_size, use_mmap=use_mmap) as writer:
+        assert writer.write_rows(ROWS[:2]) == 2
+        assert writer.write_rows(iter(ROWS[2:])) == 3
+
+    assert list(read_staging_file(path)) == EXPECTED
+    assert writer.rows_written == 5
+    assert (tmp_path / "batch.csv").stat().st_size == writer.bytes_written
+
+
+def test_mmap_output_matches_buffered_output(tmp_path):
+    for name, use_mmap in [("buffered.csv", False), ("mapped.csv", True)]:
+        with StagingFileWriter(
+            str(tmp_path / name), chunk_size=64, use_mmap=use_mmap
+        ) as writer:
+            writer.write_rows(ROWS * 50)
+
+    assert (tmp_path / "buffered.csv").read_bytes() == (
+        tmp_path / "mapped.csv"
+    ).read_bytes()
+
+
+def test_empty_strings_and_nulls_differ_in_the_file(tmp_path):
+    path = tmp_path / "batch.csv"
+
+    with StagingFileWriter(str(path)) as writer:
+        writer.write_rows([("", None)])
+
+    assert path.read_bytes() == b'"",\n'
+
+
+def test_datetime_timespec_and_offsets(tmp_path):
+    path = str(tmp_path / "batch.csv")
+    offset = datetime.timezone(datetime.timedelta(hours=2))
+
+    with StagingFileWriter(path, datetime_timespec="milliseconds") as writer:
+        writer.write_rows(
+            [
+                (datetime.datetime(2023, 1, 2, 3, 4, 5, 678901),),
+                (datetime.datetime(2023, 1, 2, 3, 4, 5, tzinfo=offset),),
+            ]
+        )
+
+    assert list(read_staging_file(path)) == [
+        ["2023-01-02 03:04:05.678"],
+        ["2023-01-02 03:04:05.000+02:00"],
+    ]
@@ -0,0 +1,63 @@
+"""Tests for the cached date and time parsers."""
+# flake8: noqa
+import datetime
+
+import pytest
+
+from target_mssql.timestamps import (
+    get_datelike_parsers,
+    parse_date,
+    parse_datetime,
+    parse_datetime_with_offset,
+    parse_time,
+)
+
+UTC = datetime.timezone.utc
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("2023-01-01T00:00:00Z", datetime.datetime(2023, 1, 1)),
+        (
+            "2023-01-01T02:30:00.123456+02:00",
+            datetime.datetime(2023, 1, 1, 0, 30, 0, 123456),
+        ),
+        ("2023-01-01 12:00:00", datetime.datetime(2023, 1, 1, 12)),
+        ("2023-01-01", datetime.datetime(2023, 1, 1)),
+        ("Jan 2 2023 10:00 UTC", datetime.datetime(2023, 1, 2, 10)),
+    ],
+)
+def test_parse_datetime_returns_naive_utc(value, expected):
+    assert parse_datetime(value) == expected
+    assert parse_datetime(value).tzinfo is None
+
+
+def test_parse_datetime_with_offset_keeps_offsets():
+    offset = datetime.timezone(datetime.timedelta(hours=2))
+
+    assert parse_datetime_with_offset("2023-01-01T02:30:00+02:00") == (
+        datetime.datetime(2023, 1, 1, 2, 30, tzinfo=offset)
+    )
+    assert parse_datetime_with_offset("2023-01-01T02:30:00").tzinfo == UTC
+
+
+def test_parse_date_and_time():
+    assert parse_date("2023-01-31") == datetime.date(2023, 1, 31)
+    assert parse_date("2023-01-31T10:00:00Z") == datetime.date(2023, 1, 31)
+    assert parse_time("10:11:12.5") == datetime.time(10, 11, 12, 500000)
+    assert parse_time("10:11:12Z") == datetime.time(10, 11, 12)
+
+
+def test_parsers_cache_repeated_values():
+    parse_datetime.cache_clear()
+
+    for _ in range(3):
+        parse_datetime("2023-05-01T00:00:00Z")
+
+    assert parse_datetime.cache_info().hits == 2
+
+
+def test_invalid_values_raise_value_error():
+    with pytest.raises(ValueError):
+        get_datelike_parsers(keep_offset=False)["date-time"]("not a timestamp")
@@ -0,0 +1,82 @@
+"""Tests for profiling record values into column types."""
+# flake8: noqa
+import decimal
+
+import pytest
+
+from target_mssql.type_inference import ColumnProfile, profile_records
+
+
+def _profile(*values):
+    profile = ColumnProfile()
+    for value in values:
+        profile.observe(value)
+    return profile
+
+
+@pytest.mark.parametrize(
+    "values,length",
+    [
+        (["a"], 16),
+        (["x" * 17], 32),
+        (["x" * 1000], 1024),
+        (["x" * 5000], 8000),
+        (["x" * 8001], None),
+        (["é" * 4001], None),
+    ],
+)
+def test_string_length_rounds_up_to_a_power_of_two(values, length):
+    assert _profile(*values).string_length == length
+
+
+def test_unicode_strings_count_utf16_code_units():
+    profile = _profile("abc", "\U0001f600")
+
+    assert profile.has_unicode
+    assert profile.max_length == 3
+
+
+@pytest.mark.parametrize(
+    "values,type_name",
+    [
+        ([1, -5, None], "SMALLINT"),
+        ([40_000], "INT"),
+        ([-(2**31) - 1], "BIGINT"),
+        ([], "SMALLINT"),
+    ],
+)
+def test_integer_type_fits_the_range_seen(values, type_name):
+    assert _profile(*values).integer_type == type_name
+
+
+def test_booleans_are_not_profiled_as_integers():
+    profile = _profile(True, False)
+
+    assert profile.value_count == 2
+    assert profile.max_integer is None
+
+
+@pytest.mark.parametrize(
+    "values,precision_and_scale",
+    [
+        ([1.5, 12.25], (9, 2)),
+        ([123456789.5], (19, 1)),
+        ([0.1 + 0.2], (19, 16)),
+        ([float("nan"), 3], (9, 0)),
+        ([1e20, 1.2345678901234567e19], (28, 0)),
+        ([decimal.Decimal("1.25"), decimal.Decimal("-12345.678")], (9, 3)),
+        ([decimal.Decimal("1E+20")], (28, 0)),
+    ],
+)
+def test_numeric_precision_and_scale(values, precision_and_scale):
+    assert _profile(*values).numeric_precision_and_scale == precision_and_scale
+
+
+def test_profile_records_ignores_missing_values():
+    profiles = profile_records(
+        [{"id": 1, "name": "ab"}, {"id": 300}], ["id", "name", "other"]
+    )
+
+    assert profiles["id"].max_integer == 300
+    assert profiles["name"].max_length == 2
+    assert profiles["other"].value_count == 0
@@ -0,0 +1,133 @@
+"""Property tests for the type widening lattice."""
+# flake8: noqa
+import sqlalchemy
+from hypothesis import example, given
+from hypothesis import strategies as st
+from sqlalchemy.dialects import mssql
+
+from target_mssql.connector import mssqlConnector
+from target_mssql.type_lattice import join_keys, type_key
+
+FIXED_TYPES = [
+    mssql.BIT(),
+    mssql.TINYINT(),
+    sqlalchemy.types.SMALLINT(),
+    sqlalchemy.types.INTEGER(),
+    sqlalchemy.types.BIGINT(),
+    mssql.REAL(),
+    sqlalchemy.types.FLOAT(),
+    sqlalchemy.types.DATE(),
+    sqlalchemy.types.TIME(),
+    mssql.SMALLDATETIME(),
+    sqlalchemy.types.DATETIME(),
+    mssql.DATETIME2(),
+    mssql.DATETIMEOFFSET(),
+    sqlalchemy.types.TEXT(),
+    mssql.NTEXT(),
+    mssql.UNIQUEIDENTIFIER(),
+]
+
+
+@st.composite
+def numerics(draw):
+    precision = draw(st.integers(min_value=1, max_value=38))
+    scale = draw(st.integers(min_value=0, max_value=precision))
+    return sqlalchemy.types.NUMERIC(precision, scale)
+
+
+sql_types = st.one_of(
+    st.sampled_from(FIXED_TYPES),
+    numerics(),
+    st.builds(
+        sqlalchemy.types.VARCHAR, st.none() | st.integers(min_value=1, max_value=8000)
+    ),
+    st.builds(mssql.NVARCHAR, st.none() | st.integers(min_value=1, max_value=4000)),
+    st.builds(mssql.VARBINARY, st.none() | st.integers(min_value=1, max_value=8000)),
+)
+
+
+def _merge(*types):
+    return mssqlConnector().merge_sql_types(list(types))
+
+
+def _widens(narrow, wide):
+    """Return True if the wide type holds everything the narrow one does."""
+    return join_keys(type_key(narrow), type_key(wide)) == type_key(wide)
+
+
+@given(sql_types, sql_types, sql_types)
+def test_merge_is_associative(first, second, third):
+    left = _merge(_merge(first, second), third)
+    right = _merge(first, _merge(second, third))
+
+    assert type_key(left) == type_key(right)
+
+
+@given(sql_types, sql_types)
+def test_merge_is_commutative(first, second):
+    assert type_key(_merge(first, second)) == type_key(_merge(second, first))
+
+
+@given(sql_types, sql_types)
+@example(sqlalchemy.types.BIGINT(), sqlalchemy.types.FLOAT())
+@example(sqlalchemy.types.NUMERIC(38, 2), mssql.REAL())
+@example(sqlalchemy.types.NUMERIC(38, 0), sqlalchemy.types.NUMERIC(10, 4))
+def test_merge_never_narrows(first, second):
+    merged = _merge(first, second)
+
+    assert _widens(first, merged)
+    assert _widens(second, merged)
+    merged_key = type_key(merged)
+    for key in (type_key(first), type_key(second)):
+        if key[0] == "string" and merged_key[0] == "string":
+            assert merged_key[1] or not key[1]
+            assert merged_key[2] is None or (
+                key[2] is not None and merged_key[2] >= key[2]
+            )
+        if key[0] == "exact" and merged_key[0] == "exact":
+            assert merged_key[1] >= key[1]
+            assert merged_key[2] >= key[2]
+        if key[0] == "exact" and merged_key[0] == "approximate":
+            # Only integers within the mantissa are held exactly
+            assert key[2] == 0
+            assert 10 ** key[1] <= 2 ** merged_key[1]
+        if key[0] == "approximate":
+            assert merged_key[0] == "string" or (
+                merged_key[0] == "approximate" and merged_key[1] >= key[1]
+            )
+
+
+def test_exact_numerics_only_join_floats_without_losing_digits():
+    assert type_key(_merge(sqlalchemy.types.INTEGER(), mssql.REAL())) == (
+        type_key(sqlalchemy.types.FLOAT())
+    )
+    for exact_type in (
+        sqlalchemy.types.BIGINT(),
+        sqlalchemy.types.NUMERIC(38, 2),
+        sqlalchemy.types.NUMERIC(5, 1),
+    ):
+        merged = _merge(exact_type, sqlalchemy.types.FLOAT())
+        assert type_key(merged) == type_key(sqlalchemy.types.VARCHAR(40))
+
+
+def test_numerics_past_38_digits_join_to_a_string():
+    merged = _merge(sqlalchemy.types.NUMERIC(38, 0), sqlalchemy.types.NUMERIC(10, 4))
+
+    assert type_key(merged) == type_key(sqlalchemy.types.VARCHAR(40))
+
+
+@given(sql_types)
+def test_merge_with_itself_keeps_the_type(sql_type):
+    assert _merge(sql_type, sql_type) is sql_type
+
+
+def test_merge_returns_an_input_holding_the_other():
+    varchar = sqlalchemy.types.VARCHAR(None)
+
+    assert _merge(sqlalchemy.types.VARCHAR(10), varchar) is varchar
+    assert type_key(_merge(mssql.BIT(), sqlalchemy.types.INTEGER())) == type_key(
+        sqlalchemy.types.INTEGER()
+    )
+    assert type_key(_merge(sqlalchemy.types.DATE(), sqlalchemy.types.DATETIME())) == (
+        type_key(mssql.DATETIME2())
+    )
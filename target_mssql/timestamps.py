@@ -0,0 +1,93 @@
+"""Cached parsing of ISO 8601 date and time strings."""
+
+from __future__ import annotations
+
+import datetime
+import functools
+from typing import Callable, Dict, Union
+
+from dateutil import parser
+
+DateLike = Union[datetime.datetime, datetime.date, datetime.time]
+
+# Distinct values remembered per parser. Batches repeat the same timestamps
+# (load dates, midnight dates, coarse event times), so most values are hits.
+PARSE_CACHE_SIZE = 65536
+
+
+def _from_isoformat(value: str) -> datetime.datetime:
+    """Parse with `datetime.fromisoformat`, falling back to dateutil.
+
+    `fromisoformat` only reads the `Z` suffix from Python 3.11 on, and only
+    the formats `datetime.isoformat` writes before that, so anything else is
+    left to the slower but lenient dateutil parser.
+    """
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return parser.parse(value)
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_datetime(value: str) -> datetime.datetime:
+    """Parse a date-time string into a naive UTC datetime.
+
+    Values with an offset are converted to UTC, as DATETIME and DATETIME2
+    columns do not store it.
+    """
+    parsed = _from_isoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_datetime_with_offset(value: str) -> datetime.datetime:
+    """Parse a date-time string, keeping its offset for DATETIMEOFFSET columns.
+
+    Values without an offset are taken to be UTC.
+    """
+    parsed = _from_isoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_date(value: str) -> datetime.date:
+    """Parse a date string, ignoring any time part."""
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        return _from_isoformat(value).date()
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_time(value: str) -> datetime.time:
+    """Parse a time string. TIME columns have no offset, so it is dropped."""
+    if value.endswith(("Z", "z")):
+        value = value[:-1]
+    try:
+        parsed = datetime.time.fromisoformat(value)
+    except ValueError:
+        parsed = parser.parse(value).time()
+    return parsed.replace(tzinfo=None)
+
+
+def get_datelike_parsers(keep_offset: bool) -> Dict[str, Callable[[str], DateLike]]:
+    """Return the parser for each datelike JSON schema format.
+
+    Args:
+        keep_offset: Whether date-time values keep their offset, for
+            DATETIMEOFFSET columns.
+
+    Returns:
+        The parsers of `date-time`, `date` and `time` values.
+    """
+    return {
+        "date-time": parse_datetime_with_offset if keep_offset else parse_datetime,
+        "date": parse_date,
+        "time": parse_time,
+    }
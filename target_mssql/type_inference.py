@@ -0,0 +1,154 @@
+"""Profiling of record values, used to size the columns of new tables."""
+
+from __future__ import annotations
+
+import decimal
+from typing import Any, Dict, Iterable, Optional
+
+# Largest lengths before a string column has to be declared as (MAX)
+MAX_VARCHAR_LENGTH = 8000
+MAX_NVARCHAR_LENGTH = 4000
+# Shortest inferred string length, so short columns are not widened repeatedly
+MIN_STRING_LENGTH = 16
+# Decimal precisions at which SQL Server storage grows (5, 9, 13 and 17 bytes)
+NUMERIC_PRECISION_TIERS = (9, 19, 28, 38)
+# Scale of the NUMERIC(38, 16) used when numbers are not profiled
+MAX_NUMERIC_SCALE = 16
+# Integer types by the range they hold
+INTEGER_RANGES = (
+    ("SMALLINT", -(2**15), 2**15 - 1),
+    ("INT", -(2**31), 2**31 - 1),
+    ("BIGINT", -(2**63), 2**63 - 1),
+)
+
+
+class ColumnProfile:
+    """Summary of the non-null values seen for one column."""
+
+    __slots__ = (
+        "value_count",
+        "max_length",
+        "has_unicode",
+        "min_integer",
+        "max_integer",
+        "integer_digits",
+        "scale",
+    )
+
+    def __init__(self) -> None:
+        """Create an empty profile."""
+        self.value_count = 0
+        self.max_length = 0
+        self.has_unicode = False
+        self.min_integer: Optional[int] = None
+        self.max_integer: Optional[int] = None
+        self.integer_digits = 0
+        self.scale = 0
+
+    def observe(self, value: Any) -> None:
+        """Add a value to the profile.
+
+        Args:
+            value: A record value. None is ignored.
+        """
+        if value is None:
+            return
+        self.value_count += 1
+
+        if isinstance(value, str):
+            self._observe_string(value)
+        elif isinstance(value, bool):
+            return
+        elif isinstance(value, int):
+            self._observe_integer(value)
+        elif isinstance(value, (float, decimal.Decimal)):
+            self._observe_decimal(value)
+
+    def _observe_string(self, value: str) -> None:
+        if value.isascii():
+            length = len(value)
+        else:
+            self.has_unicode = True
+            # NVARCHAR lengths count UTF-16 code units
+            length = len(value.encode("utf-16-le")) // 2
+        if length > self.max_length:
+            self.max_length = length
+
+    def _observe_integer(self, value: int) -> None:
+        if self.min_integer is None or value < self.min_integer:
+            self.min_integer = value
+        if self.max_integer is None or value > self.max_integer:
+            self.max_integer = value
+        self.integer_digits = max(self.integer_digits, len(str(abs(value))))
+
+    def _observe_decimal(self, value: float | decimal.Decimal) -> None:
+        number = (
+            value
+            if isinstance(value, decimal.Decimal)
+            else decimal.Decimal(repr(value))
+        )
+        _, digits, exponent = number.as_tuple()
+        if not isinstance(exponent, int):
+            # NaN and infinity have no digits to size a column by
+            return
+        scale = max(0, -exponent)
+        self.scale = max(self.scale, scale)
+        # A positive exponent adds trailing zeros, as in repr(1e20) == '1e+20'
+        integer_digits = len(digits) + exponent if exponent > 0 else len(digits) - scale
+        self.integer_digits = max(self.integer_digits, integer_digits)
+
+    @property
+    def string_length(self) -> Optional[int]:
+        """Return the declared length fitting the strings seen, None for (MAX).
+
+        Lengths are rounded up to a power of two, leaving room to grow.
+        """
+        limit = MAX_NVARCHAR_LENGTH if self.has_unicode else MAX_VARCHAR_LENGTH
+        if self.max_length > limit:
+            return None
+        length = MIN_STRING_LENGTH
+        while length < self.max_length:
+            length *= 2
+        return min(length, limit)
+
+    @property
+    def integer_type(self) -> str:
+        """Return the name of the smallest integer type holding the values seen."""
+        for type_name, low, high in INTEGER_RANGES:
+            if (self.min_integer or 0) >= low and (self.max_integer or 0) <= high:
+                return type_name
+        return "BIGINT"
+
+    @property
+    def numeric_precision_and_scale(self) -> tuple[int, int]:
+        """Return the NUMERIC precision and scale fitting the numbers seen.
+
+        The scale is capped at that of the unprofiled NUMERIC(38, 16), and the
+        precision rounded up to the next storage size.
+        """
+        scale = min(self.scale, MAX_NUMERIC_SCALE)
+        integer_digits = max(1, self.integer_digits)
+        for precision in NUMERIC_PRECISION_TIERS:
+            if integer_digits + scale <= precision:
+                return precision, scale
+        return NUMERIC_PRECISION_TIERS[-1], max(0, 38 - integer_digits)
+
+
+def profile_records(
+    records: Iterable[Dict[str, Any]], property_names: Iterable[str]
+) -> Dict[str, ColumnProfile]:
+    """Profile the values of the given properties over a batch of records.
+
+    Args:
+        records: The records to profile.
+        property_names: The properties to profile.
+
+    Returns:
+        A profile per property name.
+    """
+    profiles = {name: ColumnProfile() for name in property_names}
+    observers = [(name, profile.observe) for name, profile in profiles.items()]
+    for record in records:
+        for name, observe in observers:
+            observe(record.get(name))
+    return profiles
@@ -0,0 +1,239 @@
+"""Widening lattice of the SQL Server column types the target works with.
+
+Every type is reduced to a small hashable key, and the join of two keys is
+the smallest type holding the values of both. Joins are memoized by key, so
+reconciling a table with a schema costs a dictionary lookup per column.
+
+The lattice has one family per kind of value:
+
+* exact numerics: BIT < TINYINT < SMALLINT < INT < BIGINT, and NUMERIC(p, s)
+  sized by its integer digits and scale. Joins needing more than 38 digits
+  go to a string.
+* approximate numerics: REAL < FLOAT. Integers of up to 7 digits are held
+  exactly by REAL, and of up to 15 by FLOAT. Other exact numerics, with a
+  scale or more digits, join approximate ones to a string.
+* date and time types: SMALLDATETIME < DATETIME, and every type <
+  DATETIME2 < DATETIMEOFFSET.
+* strings: VARCHAR(n) < VARCHAR(MAX), VARCHAR(n) < NVARCHAR(n), with lengths
+  past the largest declarable one becoming (MAX).
+* other types, such as TEXT or VARBINARY, only widen within their own type.
+
+Strings are the top of the lattice. Types of different families join to a
+string long enough for the text of any value of either.
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import Optional, Tuple, Type, cast
+
+import sqlalchemy
+from sqlalchemy.dialects import mssql
+
+from target_mssql.type_inference import MAX_NVARCHAR_LENGTH, MAX_VARCHAR_LENGTH
+
+# A type reduced to its family and the sizes that matter for widening
+TypeKey = Tuple
+
+MAX_NUMERIC_PRECISION = 38
+# Integer types, from BIT up, by the number of decimal digits they hold
+INTEGER_TYPES_BY_DIGITS = {
+    1: mssql.BIT,
+    3: mssql.TINYINT,
+    5: sqlalchemy.types.SMALLINT,
+    10: sqlalchemy.types.INTEGER,
+    19: sqlalchemy.types.BIGINT,
+}
+INTEGER_DIGITS = (
+    (sqlalchemy.types.Boolean, 1),
+    (mssql.TINYINT, 3),
+    (sqlalchemy.types.SmallInteger, 5),
+    (sqlalchemy.types.BigInteger, 19),
+    (sqlalchemy.types.Integer, 10),
+)
+# Mantissa bits of REAL and FLOAT, and the integer digits each holds exactly
+REAL_BITS = 24
+FLOAT_BITS = 53
+APPROXIMATE_INTEGER_DIGITS = ((REAL_BITS, 7), (FLOAT_BITS, 15))
+# Date and time types, ordered so the first common upper bound is the least
+TEMPORAL_TYPES = {
+    "DATE": sqlalchemy.types.DATE,
+    "TIME": sqlalchemy.types.TIME,
+    "SMALLDATETIME": mssql.SMALLDATETIME,
+    "DATETIME": sqlalchemy.types.DATETIME,
+    "DATETIME2": mssql.DATETIME2,
+    "DATETIMEOFFSET": mssql.DATETIMEOFFSET,
+}
+TEMPORAL_UPPER_BOUNDS = {
+    "DATE": {"DATE", "DATETIME2", "DATETIMEOFFSET"},
+    "TIME": {"TIME", "DATETIME2", "DATETIMEOFFSET"},
+    "SMALLDATETIME": {"SMALLDATETIME", "DATETIME", "DATETIME2", "DATETIMEOFFSET"},
+    "DATETIME": {"DATETIME", "DATETIME2", "DATETIMEOFFSET"},
+    "DATETIME2": {"DATETIME2", "DATETIMEOFFSET"},
+    "DATETIMEOFFSET": {"DATETIMEOFFSET"},
+}
+# Longest text of a value of each family, when it has to fit a string column:
+# a NUMERIC(38, s) with sign and decimal point, and a DATETIMEOFFSET(7).
+NUMERIC_TEXT_LENGTH = MAX_NUMERIC_PRECISION + 2
+TEMPORAL_TEXT_LENGTH = 34
+
+
+def type_key(sql_type: sqlalchemy.types.TypeEngine) -> TypeKey:
+    """Return the lattice key of a type.
+
+    Types with the same key hold the same values, whatever their collation
+    or the SQLAlchemy class they were reflected as.
+    """
+    if isinstance(sql_type, (sqlalchemy.types.Boolean, sqlalchemy.types.Integer)):
+        for integer_type, digits in INTEGER_DIGITS:
+            if isinstance(sql_type, integer_type):
+                return ("exact", digits, 0, True)
+    if isinstance(sql_type, sqlalchemy.types.Float):
+        precision = sql_type.precision
+        is_real = isinstance(sql_type, sqlalchemy.types.REAL) or (
+            precision is not None and precision <= REAL_BITS
+        )
+        return ("approximate", REAL_BITS if is_real else FLOAT_BITS)
+    if isinstance(sql_type, sqlalchemy.types.Numeric):
+        # SQL Server defaults to DECIMAL(18, 0)
+        precision = sql_type.precision or 18
+        scale = sql_type.scale or 0
+        return ("exact", precision - scale, scale, False)
+    if isinstance(sql_type, (sqlalchemy.types.DateTime, sqlalchemy.types.Date)):
+        return ("temporal", _temporal_name(sql_type))
+    if isinstance(sql_type, sqlalchemy.types.Time):
+        return ("temporal", "TIME")
+    if isinstance(sql_type, sqlalchemy.types.String) and not isinstance(
+        sql_type, (sqlalchemy.types.Text, sqlalchemy.types.Enum)
+    ):
+        return (
+            "string",
+            isinstance(sql_type, sqlalchemy.types.Unicode),
+            sql_type.length,
+        )
+    return ("other", type(sql_type), getattr(sql_type, "length", None))
+
+
+def _temporal_name(sql_type: sqlalchemy.types.TypeEngine) -> str:
+    for name in ("DATETIMEOFFSET", "DATETIME2", "SMALLDATETIME"):
+        if isinstance(sql_type, TEMPORAL_TYPES[name]):
+            return name
+    if isinstance(sql_type, sqlalchemy.types.DateTime):
+        return "DATETIME"
+    return "DATE"
+
+
+@functools.lru_cache(maxsize=4096)
+def join_keys(first: TypeKey, second: TypeKey) -> TypeKey:
+    """Return the key of the smallest type holding both keys' values."""
+    if first == second:
+        return first
+    families = {first[0], second[0]}
+    if families <= {"exact", "approximate"}:
+        return _join_numeric(first, second)
+    if families == {"temporal"}:
+        return ("temporal", _join_temporal(first[1], second[1]))
+    if families == {"string"}:
+        return _join_string(first, second)
+    if families == {"other"} and first[1] is second[1]:
+        # Only types with a length have keys differing in anything but class
+        if first[2] is None or second[2] is None:
+            return ("other", first[1], None)
+        return ("other", first[1], max(first[2], second[2]))
+    return _join_string(_as_string_key(first), _as_string_key(second))
+
+
+def _join_numeric(first: TypeKey, second: TypeKey) -> TypeKey:
+    if first[0] == "approximate" and second[0] == "approximate":
+        return ("approximate", max(first[1], second[1]))
+    if first[0] == "approximate" or second[0] == "approximate":
+        approximate, exact = (
+            (first, second)
+            if first[0] == "approximate"
+            else (
+                second,
+                first,
+            )
+        )
+        bits = _approximate_bits(exact)
+        if bits is None:
+            return _join_string(_as_string_key(first), _as_string_key(second))
+        return ("approximate", max(approximate[1], bits))
+    integer_digits = max(first[1], second[1])
+    scale = max(first[2], second[2])
+    if first[3] and second[3]:
+        return ("exact", integer_digits, 0, True)
+    if integer_digits + scale > MAX_NUMERIC_PRECISION:
+        return _join_string(_as_string_key(first), _as_string_key(second))
+    return ("exact", integer_digits, scale, False)
+
+
+def _approximate_bits(key: TypeKey) -> Optional[int]:
+    """Return the mantissa bits holding an exact key's values, if any do.
+
+    Binary floating point holds integers up to a number of digits, but no
+    decimal fractions.
+    """
+    if key[2]:
+        return None
+    for bits, integer_digits in APPROXIMATE_INTEGER_DIGITS:
+        if key[1] <= integer_digits:
+            return bits
+    return None
+
+
+def _join_temporal(first: str, second: str) -> str:
+    common = TEMPORAL_UPPER_BOUNDS[first] & TEMPORAL_UPPER_BOUNDS[second]
+    return next(name for name in TEMPORAL_TYPES if name in common)
+
+
+def _join_string(first: TypeKey, second: TypeKey) -> TypeKey:
+    is_unicode = first[1] or second[1]
+    length: Optional[int] = None
+    if first[2] is not None and second[2] is not None:
+        length = max(first[2], second[2])
+        if length > (MAX_NVARCHAR_LENGTH if is_unicode else MAX_VARCHAR_LENGTH):
+            length = None
+    return ("string", is_unicode, length)
+
+
+def _as_string_key(key: TypeKey) -> TypeKey:
+    """Return the key of the string holding the text of any value of a key.
+
+    Each family maps to a single string, so that joining across families
+    does not depend on the order of the joins.
+    """
+    if key[0] == "string":
+        return key
+    if key[0] in ("exact", "approximate"):
+        return ("string", False, NUMERIC_TEXT_LENGTH)
+    if key[0] == "temporal":
+        return ("string", False, TEMPORAL_TEXT_LENGTH)
+    return ("string", issubclass(key[1], sqlalchemy.types.UnicodeText), None)
+
+
+def type_of_key(key: TypeKey) -> sqlalchemy.types.TypeEngine:
+    """Return a type with the given lattice key."""
+    family = key[0]
+    if family == "exact":
+        _, integer_digits, scale, is_integer = key
+        if is_integer:
+            return cast(
+                sqlalchemy.types.TypeEngine, INTEGER_TYPES_BY_DIGITS[integer_digits]()
+            )
+        return cast(
+            sqlalchemy.types.TypeEngine,
+            sqlalchemy.types.NUMERIC(integer_digits + scale, scale),
+        )
+    if family == "approximate":
+        if key[1] == REAL_BITS:
+            return cast(sqlalchemy.types.TypeEngine, mssql.REAL())
+        return cast(sqlalchemy.types.TypeEngine, sqlalchemy.types.FLOAT())
+    if family == "temporal":
+        return cast(sqlalchemy.types.TypeEngine, TEMPORAL_TYPES[key[1]]())
+    if family == "string":
+        if key[1]:
+            return cast(sqlalchemy.types.TypeEngine, mssql.NVARCHAR(key[2]))
+        return cast(sqlalchemy.types.TypeEngine, sqlalchemy.types.VARCHAR(key[2]))
+    other_type = cast(Type[sqlalchemy.types.TypeEngine], key[1])
+    return other_type(length=key[2])  # type: ignore[call-arg]